@@ -2,6 +2,7 @@
 
 import sys
 import logging
+import multiprocessing
 from pathlib import Path
 from tkinter import messagebox # <--- 【修正一：在這裡導入 messagebox】
 
@@ -9,16 +10,23 @@ from tkinter import messagebox # <--- 【修正一：在這裡導入 messagebox
 try:
     from nessus_reporter.app_controller import AppController, IView
     from nessus_reporter.ui.main_window import MainWindow
+    from nessus_reporter import cli
 except ImportError:
     src_path = str(Path(__file__).resolve().parent / 'src')
     if src_path not in sys.path:
         sys.path.insert(0, src_path)
     from nessus_reporter.app_controller import AppController, IView
     from nessus_reporter.ui.main_window import MainWindow
+    from nessus_reporter import cli
 
 
 def main():
     """應用程式的主入口點。"""
+    # 帶有參數時以命令列模式執行（例如分片處理），不啟動圖形介面
+    if len(sys.argv) > 1:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        sys.exit(cli.main(sys.argv[1:]))
+
     # 設定日誌
     logging.basicConfig(
         level=logging.INFO,
@@ -50,4 +58,6 @@ def main():
         messagebox.showerror("嚴重錯誤", f"應用程式意外終止。\n\n詳情: {e}")
 
 if __name__ == "__main__":
+    # 打包後的 .exe 使用多行程平行處理時必須呼叫
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -12,8 +12,13 @@ from abc import ABC, abstractmethod
 
 # 導入我們所有的核心元件和型別
 from .core.config_manager import ConfigurationManager, ConfigError, FieldConfig
-from .core.processor import BatchProcessor, ParsingError, BatchProcessingResult
+from .core.processor import BatchProcessor, ParsingError, BatchProcessingResult, ProgressInfo
+from .core.sources import DiscoveryOptions
 from .core.generator import ExcelReportGenerator, ReportGenerationError
+from .core.html_generator import report_generator_for
+from .core.store import FindingsStore, StoreError
+from .core.sorter import ExternalSorter, SortKey
+from .core.parser import LazyTextResolver
 
 # --- 【新增這個輔助函式】 ---
 def resource_path(relative_path: str) -> Path:
@@ -43,7 +48,7 @@ class IView(ABC):
     def update_status(self, text: str) -> None: pass
 
     @abstractmethod
-    def update_progress(self, current: int, total: int) -> None: pass
+    def update_progress(self, current: int, total: int, eta_seconds: Optional[float] = None) -> None: pass
 
     @abstractmethod
     def set_ui_state(self, is_enabled: bool) -> None: pass
@@ -67,7 +72,7 @@ class MockMainWindow(IView):
     def show_error(self, title: str, message: str): print(f"--- [UI ERROR] ---\n標題: {title}\n訊息: {message}\n------------------")
     def show_info(self, title: str, message: str): print(f"--- [UI INFO] ---\n標題: {title}\n訊息: {message}\n-----------------")
     def update_status(self, text: str): print(f"[UI STATUS] -> {text}")
-    def update_progress(self, current: int, total: int): print(f"[UI PROGRESS] -> {current}/{total} ({(current / total) * 100:.1f}%)")
+    def update_progress(self, current: int, total: int, eta_seconds: Optional[float] = None): print(f"[UI PROGRESS] -> {current}/{total} ({(current / total if total else 1) * 100:.1f}%) ETA: {'--' if eta_seconds is None else f'{eta_seconds:.0f}s'}")
     def set_ui_state(self, is_enabled: bool): print(f"[UI STATE] -> 主要按鈕已設為: {'啟用' if is_enabled else '禁用'}")
     def get_selected_columns(self) -> List[str]: 
         if self.controller:
@@ -93,8 +98,12 @@ class AppController:
         self.view: IView
         self.config_manager: Optional[ConfigurationManager] = None
         self.fields_config: List[FieldConfig] = []
+        self.sort_keys: List[SortKey] = []
+        self.discovery = DiscoveryOptions()
+        self.max_workers: int = 1
         self.processing_lock = threading.Lock()
         self.ui_queue = queue.Queue()
+        self.base_path: Path = Path(".").resolve()
 
         try:
             # 步驟一：【先】載入設定檔。
@@ -107,11 +116,15 @@ class AppController:
                 # 這裡我們假設 app_controller.py 在 src/nessus_reporter/ 中
                 base_path = Path(__file__).resolve().parents[2]
 
+            self.base_path = base_path
             config_file_path = base_path / 'config.yaml'
             
             logging.info(f"正在從以下路徑載入設定檔: {config_file_path}")
             self.config_manager = ConfigurationManager.from_file(config_file_path)
             self.fields_config = self.config_manager.get_all_fields()
+            self.sort_keys = SortKey.from_config(self.config_manager.get_setting('sort_by'), self.fields_config)
+            self.discovery = DiscoveryOptions.from_settings(self.config_manager.get_setting)
+            self.max_workers = int(self.config_manager.get_setting('max_workers', 1) or 1)
 
             # 步驟二：【後】使用傳入的類別，建立 View 的實例。
             # 這樣 View 在初始化時，Controller 就已經準備好設定資料了。
@@ -156,35 +169,107 @@ class AppController:
 
     def _run_batch_task(self, input_folder: Path, output_path: Path, selected_columns: List[str]):
         """這個方法會在背景執行緒中執行。"""
+        store: Optional[FindingsStore] = None
         try:
-            result = BatchProcessor.process_folder(
-                input_folder, self.fields_config, progress_callback=self._progress_update_handler
-            )
+            store = self._open_findings_store()
+            lazy = bool(self.config_manager and self.config_manager.get_setting('lazy_text', False))
+            errors: List[dict] = []
+
+            if self.sort_keys:
+                # 設定了排序時，改走外部排序的串流流程，記憶體用量與不排序時相同
+                has_data = self._generate_sorted_report(input_folder, output_path, selected_columns, store, lazy, errors)
+            else:
+                result = BatchProcessor.process_folder(
+                    input_folder, self.fields_config,
+                    progress_callback=self._progress_update_handler,
+                    sink=store,
+                    lazy=lazy,
+                    discovery=self.discovery,
+                    max_workers=self.max_workers
+                )
+                errors = result.errors
+                has_data = not result.dataframe.empty
+                if has_data:
+                    self.ui_queue.put(("update_status", "解析完成，正在生成報告..."))
+                    report_generator_for(output_path).generate_report(result.dataframe, selected_columns, output_path, self.fields_config)
             
-            if not result.dataframe.empty:
-                self.ui_queue.put(("update_status", "解析完成，正在生成 Excel 報告..."))
-                ExcelReportGenerator.generate_report(result.dataframe, selected_columns, output_path)
+            if has_data:
                 self.ui_queue.put(("update_status", "報告生成成功！"))
                 self.ui_queue.put(("show_info", "完成", f"報告已成功儲存至:\n{output_path.resolve()}"))
             else:
                 self.ui_queue.put(("update_status", "處理完成，但沒有可生成的資料。"))
 
-            if result.errors:
-                logging.warning(f"處理過程中發生了 {len(result.errors)} 個錯誤。")
+            if errors:
+                logging.warning(f"處理過程中發生了 {len(errors)} 個錯誤。")
 
-        except (ParsingError, ReportGenerationError, Exception) as e:
+        except (ParsingError, ReportGenerationError, StoreError, Exception) as e:
             logging.error(f"處理過程中發生嚴重錯誤: {e}")
             self.ui_queue.put(("show_error", "處理失敗", f"發生嚴重錯誤:\n{e}"))
         
         finally:
+            if store is not None:
+                store.close()
             self.ui_queue.put(("set_ui_state", True))
             self.ui_queue.put(("update_status", "準備就緒。"))
             self.processing_lock.release() # 確保鎖最終會被釋放
 
-    def _progress_update_handler(self, current: int, total: int, path: Path):
-        """由背景執行緒呼叫，將更新指令放入佇列。"""
-        self.ui_queue.put(("update_progress", current, total))
-        self.ui_queue.put(("update_status", f"正在處理 [{current}/{total}]: {path.name}"))
+    def _generate_sorted_report(
+        self, input_folder: Path, output_path: Path, selected_columns: List[str],
+        store: Optional[FindingsStore], lazy: bool, errors: List[dict]
+    ) -> bool:
+        """
+        逐檔解析並交給外部排序器，再將 k-way merge 的結果串流寫入報告。
+
+        lazy 欄位在加入排序器之前逐檔補回：此時資料仍依檔案順序排列，每個來源只需循序讀取一次；
+        若留到排序後才補回，每一批資料都混有所有來源的資料列，會使各來源被反覆重新解析。
+        補回的文字隨排序段落寫入暫存檔，不會增加記憶體用量。
+
+        Returns:
+            bool: 是否有任何資料被寫出。
+        """
+        columns = [f['displayName'] for f in self.fields_config]
+
+        with ExternalSorter(self.sort_keys, columns) as sorter, LazyTextResolver(self.fields_config) as resolver:
+            row_count = 0
+            for df in BatchProcessor.iter_folder(
+                input_folder, self.fields_config, errors,
+                progress_callback=self._progress_update_handler, sink=store, lazy=lazy,
+                discovery=self.discovery, max_workers=self.max_workers
+            ):
+                sorter.add(resolver.materialize(df))
+                row_count += len(df)
+
+            if row_count == 0:
+                return False
+
+            self.ui_queue.put(("update_status", "解析完成，正在排序並生成報告..."))
+            report_generator_for(output_path).generate_report_from_chunks(
+                sorter.iter_sorted_chunks(ExcelReportGenerator.WRITE_BATCH_ROWS),
+                selected_columns, output_path, self.fields_config
+            )
+        return True
+
+    def _open_findings_store(self) -> Optional[FindingsStore]:
+        """若設定檔中啟用了 `findings_store`，則開啟本地弱點資料庫（相對路徑以設定檔所在目錄為準）。"""
+        if not self.config_manager:
+            return None
+        store_setting = self.config_manager.get_setting('findings_store')
+        if not store_setting:
+            return None
+        store_path = Path(store_setting)
+        if not store_path.is_absolute():
+            store_path = self.base_path / store_path
+        return FindingsStore(store_path, self.fields_config)
+
+    def _progress_update_handler(self, progress: ProgressInfo):
+        """由背景執行緒呼叫，將更新指令放入佇列。進度以位元組計算，並附帶依吞吐量推算的 ETA。"""
+        self.ui_queue.put(("update_progress", progress.bytes_done, progress.bytes_total, progress.eta_seconds))
+        current_name = progress.source.name if progress.source else "..."
+        self.ui_queue.put((
+            "update_status",
+            f"已處理 [{progress.files_done}/{progress.files_total}] {current_name} | "
+            f"{progress.rows_done:,} 筆 | {progress.bytes_per_second / 1024 / 1024:.1f} MB/s"
+        ))
         
     def process_ui_queue(self):
         """由 UI 主執行緒定期呼叫，安全地執行 UI 更新。"""
@@ -0,0 +1,209 @@
+# src/nessus_reporter/cli.py
+
+import sys
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from .core.config_manager import ConfigurationManager, ConfigError, FieldConfig
+from .core.sorter import SortKey, ExternalSorter
+from .core.sharding import ShardPlanner, ShardError
+from .core.generator import ExcelReportGenerator, ReportGenerationError
+from .core.html_generator import report_generator_for
+from .core.store import FindingsStore, StoreError
+from .core.processor import BatchProcessor
+from .core.incremental import IncrementalError, PartitionWriter
+from .core.sources import DiscoveryOptions
+
+# 與 AppController 相同：打包後的 .exe 讀取同層目錄的設定檔，開發環境則讀取專案根目錄
+if getattr(sys, 'frozen', False):
+    DEFAULT_CONFIG_PATH = Path(sys.executable).parent / 'config.yaml'
+else:
+    DEFAULT_CONFIG_PATH = Path(__file__).resolve().parents[2] / 'config.yaml'
+
+def _default_columns(fields_config: List[FieldConfig]) -> List[str]:
+    """與 UI 相同：預設匯出設定檔中 `default: true` 的欄位。"""
+    return [f['displayName'] for f in fields_config if f.get('default', False)]
+
+def _run_shard_job(manifest_path: Path, shard_index: int, config_path: Path, partial_dir: Path, folder: Optional[Path]) -> int:
+    """在子行程中執行單一分片，回傳錯誤數量。"""
+    fields_config = ConfigurationManager.from_file(config_path).get_all_fields()
+    return len(ShardPlanner.run_shard(manifest_path, shard_index, fields_config, partial_dir, folder=folder))
+
+def _cmd_shard_plan(args: argparse.Namespace, config_manager: ConfigurationManager) -> int:
+    discovery = DiscoveryOptions.from_settings(config_manager.get_setting)
+    manifest = ShardPlanner.create_manifest(args.folder, args.shards, args.manifest, discovery)
+    for shard in manifest["shards"]:
+        print(f"分片 {shard['index']}: {len(shard['sources'])} 個檔案, {shard['total_bytes']:,} bytes")
+    print(f"分片清單已寫入: {args.manifest}")
+    return 0
+
+def _cmd_shard_run(args: argparse.Namespace, config_manager: ConfigurationManager) -> int:
+    if args.index is not None:
+        errors = ShardPlanner.run_shard(
+            args.manifest, args.index, config_manager.get_all_fields(), args.partials, folder=args.folder
+        )
+        return 1 if errors else 0
+
+    # 未指定分片編號時，以多個本機行程同時執行所有分片
+    shard_count = len(ShardPlanner.load_manifest(args.manifest)["shards"])
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(_run_shard_job, args.manifest, i, args.config, args.partials, args.folder)
+            for i in range(shard_count)
+        ]
+        error_count = sum(future.result() for future in futures)
+    return 1 if error_count else 0
+
+def _cmd_shard_merge(args: argparse.Namespace, config_manager: ConfigurationManager) -> int:
+    fields_config = config_manager.get_all_fields()
+    selected_columns = args.columns or _default_columns(fields_config)
+    sort_keys = SortKey.from_config(config_manager.get_setting('sort_by'), fields_config)
+    errors = ShardPlanner.merge_partials(
+        args.manifest, args.partials, selected_columns, args.output, fields_config, sort_keys
+    )
+    for error in errors:
+        logging.warning(f"{error['file']}: {error['error']}")
+    print(f"報告已成功儲存至: {args.output.resolve()}")
+    return 0
+
+def _cmd_watch(args: argparse.Namespace, config_manager: ConfigurationManager) -> int:
+    fields_config = config_manager.get_all_fields()
+    selected_columns = args.columns or _default_columns(fields_config)
+    discovery = DiscoveryOptions.from_settings(config_manager.get_setting)
+
+    if args.once:
+        result = BatchProcessor.refresh_folder(
+            args.folder, fields_config, args.output, args.format, selected_columns,
+            settle_seconds=args.settle, discovery=discovery
+        )
+        print(f"新增 {len(result.added)}、更新 {len(result.updated)}、移除 {len(result.removed)} 個檔案，寫入 {result.rows_written} 筆資料。")
+        return 1 if result.errors else 0
+
+    print(f"開始監看 {args.folder}（每 {args.interval} 秒檢查一次，按 Ctrl+C 結束）")
+    try:
+        BatchProcessor.watch_folder(
+            args.folder, fields_config, args.output, args.format, selected_columns,
+            interval=args.interval, settle_seconds=args.settle, discovery=discovery
+        )
+    except KeyboardInterrupt:
+        print("已停止監看。")
+    return 0
+
+def _cmd_query(args: argparse.Namespace, config_manager: ConfigurationManager) -> int:
+    store_setting = args.store or config_manager.get_setting('findings_store')
+    if not store_setting:
+        logging.error("未指定弱點資料庫：請使用 --store 或在 config.yaml 中設定 findings_store。")
+        return 2
+    # 與 AppController 相同：相對路徑以設定檔所在目錄為準
+    store_path = Path(store_setting)
+    if not store_path.is_absolute():
+        store_path = args.config.resolve().parent / store_path
+    if not store_path.is_file():
+        logging.error(f"弱點資料庫不存在: {store_path}")
+        return 2
+
+    conditions: List[str] = [args.where] if args.where else []
+    params: List[str] = list(args.param or [])
+    for field_id, value, operator in (
+        ('host_ip', args.host, '='), ('plugin_id', args.plugin, '='),
+        (FindingsStore.SCAN_TIME_COLUMN, args.since, '>='), (FindingsStore.SCAN_TIME_COLUMN, args.until, '<'),
+    ):
+        if value:
+            conditions.append(f'"{field_id}" {operator} ?')
+            params.append(value)
+    where = " AND ".join(f"({condition})" for condition in conditions)
+
+    fields_config = config_manager.get_all_fields()
+    extra_columns = [FindingsStore.SCAN_TIME_COLUMN, FindingsStore.SOURCE_FILE_COLUMN]
+    selected_columns = args.columns or _default_columns(fields_config) + extra_columns
+    sort_keys = SortKey.from_config(config_manager.get_setting('sort_by'), fields_config)
+    generator = report_generator_for(args.output)
+
+    with FindingsStore(store_path, fields_config) as store:
+        row_count = store.count(where, params)
+        if row_count == 0:
+            print("沒有符合條件的資料。")
+            return 0
+
+        chunks = store.iter_query(where, params, ExcelReportGenerator.WRITE_BATCH_ROWS)
+        if sort_keys:
+            columns = [f['displayName'] for f in fields_config] + extra_columns
+            with ExternalSorter(sort_keys, columns) as sorter:
+                for chunk in chunks:
+                    sorter.add(chunk)
+                generator.generate_report_from_chunks(
+                    sorter.iter_sorted_chunks(ExcelReportGenerator.WRITE_BATCH_ROWS),
+                    selected_columns, args.output, fields_config
+                )
+        else:
+            generator.generate_report_from_chunks(chunks, selected_columns, args.output, fields_config)
+
+    print(f"已匯出 {row_count} 筆資料，報告已成功儲存至: {args.output.resolve()}")
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='NessusTool', description="Nessus 報告客製化工具（命令列模式）")
+    parser.add_argument('--config', type=Path, default=DEFAULT_CONFIG_PATH, help="config.yaml 的路徑")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    plan = subparsers.add_parser('shard-plan', help="依檔案大小將資料夾切分為分片清單")
+    plan.add_argument('folder', type=Path, help="包含 .nessus 檔案的資料夾")
+    plan.add_argument('--shards', type=int, required=True, help="分片數量")
+    plan.add_argument('--manifest', type=Path, required=True, help="分片清單的輸出路徑")
+    plan.set_defaults(handler=_cmd_shard_plan)
+
+    run = subparsers.add_parser('shard-run', help="處理一個（或全部）分片，輸出部分結果")
+    run.add_argument('manifest', type=Path, help="分片清單路徑")
+    run.add_argument('--partials', type=Path, required=True, help="部分結果的共用目錄")
+    run.add_argument('--index', type=int, help="要處理的分片編號；省略時在本機以多行程處理所有分片")
+    run.add_argument('--workers', type=int, default=None, help="本機行程數（僅在省略 --index 時使用）")
+    run.add_argument('--folder', type=Path, help="來源資料夾在此節點上的路徑；預設為清單中記錄的路徑")
+    run.set_defaults(handler=_cmd_shard_run)
+
+    merge = subparsers.add_parser('shard-merge', help="合併所有部分結果並生成 Excel（或 HTML）報告")
+    merge.add_argument('manifest', type=Path, help="分片清單路徑")
+    merge.add_argument('--partials', type=Path, required=True, help="部分結果的共用目錄")
+    merge.add_argument('--output', type=Path, required=True, help="報告的輸出路徑；副檔名為 .html 時生成分頁式 HTML 報告")
+    merge.add_argument('--columns', nargs='+', help="要匯出的欄位 displayName；預設為設定檔中的預設欄位")
+    merge.set_defaults(handler=_cmd_shard_merge)
+
+    watch = subparsers.add_parser('watch', help="監看資料夾，只處理新增或變動的檔案並增量更新輸出分區")
+    watch.add_argument('folder', type=Path, help="要監看的資料夾")
+    watch.add_argument('--output', type=Path, required=True, help="分區檔與處理清單的輸出目錄")
+    watch.add_argument('--format', choices=PartitionWriter.SUPPORTED_FORMATS, default='csv', help="分區檔格式")
+    watch.add_argument('--columns', nargs='+', help="要匯出的欄位 displayName；預設為設定檔中的預設欄位")
+    watch.add_argument('--interval', type=float, default=30.0, help="檢查間隔（秒）")
+    watch.add_argument('--settle', type=float, default=5.0, help="修改時間距今少於此秒數的檔案視為仍在寫入中")
+    watch.add_argument('--once', action='store_true', help="只執行一次增量更新後結束")
+    watch.set_defaults(handler=_cmd_watch)
+
+    query = subparsers.add_parser('query', help="從弱點資料庫 (findings_store) 查詢跨掃描的資料並生成報告")
+    query.add_argument('--output', type=Path, required=True, help="報告的輸出路徑；副檔名為 .html 時生成分頁式 HTML 報告")
+    query.add_argument('--store', help="弱點資料庫路徑；預設為設定檔中的 findings_store")
+    query.add_argument('--host', help="只包含此主機 (host_ip)")
+    query.add_argument('--plugin', help="只包含此弱點編號 (plugin_id)")
+    query.add_argument('--since', help="只包含掃描時間不早於此時間者，ISO 格式，例如 2026-01-01")
+    query.add_argument('--until', help="只包含掃描時間早於此時間者，ISO 格式")
+    query.add_argument('--where', help="額外的 SQL WHERE 條件（以 field id 作為欄位名稱），例如 \"severity IN ('Critical', 'High')\"")
+    query.add_argument('--param', action='append', help="--where 中 ? 對應的參數，可重複指定")
+    query.add_argument('--columns', nargs='+', help="要匯出的欄位 displayName（另可使用 scan_time、source_file）")
+    query.set_defaults(handler=_cmd_query)
+
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令列模式的主入口點，回傳程式結束代碼。"""
+    args = build_parser().parse_args(argv)
+    try:
+        config_manager = ConfigurationManager.from_file(args.config)
+        return args.handler(args, config_manager)
+    except (ConfigError, ShardError, IncrementalError, ReportGenerationError, StoreError) as e:
+        logging.error(str(e))
+        return 2
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
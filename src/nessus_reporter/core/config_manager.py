@@ -30,13 +30,14 @@ class FieldConfig(TypedDict, total=False):
     default: bool
     description: str
     mapping: Dict[str, str]
+    lazy: bool        # 大型文字欄位，lazy 模式下延後到寫出報告時才讀取
 
 class ConfigurationManager:
     """
     負責讀取、驗證並提供對 `config.yaml` 存取介面之物件
     """
 
-    def __init__(self, fields: List[FieldConfig]):
+    def __init__(self, fields: List[FieldConfig], settings: Optional[Dict[str, Any]] = None):
         """
         一個簡單、快速的初始化方法。
         它的唯一職責是接收已經被驗證過的資料，並設定好內部狀態。
@@ -44,8 +45,10 @@ class ConfigurationManager:
 
         Args:
             fields (List[FieldConfig]): 一個已經被驗證過的欄位設定列表。
+            settings (Optional[Dict[str, Any]]): 設定檔中可選的 'settings' 區塊。
         """
         self._fields: List[FieldConfig] = fields
+        self._settings: Dict[str, Any] = settings or {}
         
         # 根據傳入的 fields 列表，建立一個用於快速查詢的字典
         self._fields_by_id: Dict[str, FieldConfig] = {
@@ -110,8 +113,13 @@ class ConfigurationManager:
             seen_ids.add(field_id)
             validated_fields.append(field) # type: ignore
 
-        # 5. 使用驗證過的資料，透過 `cls()` (即 ConfigurationManager) 創建並回傳實例
-        return cls(validated_fields)
+        # 5. 驗證可選的 'settings' 區塊
+        settings = config_data.get('settings') or {}
+        if not isinstance(settings, dict):
+            raise InvalidConfigError("'settings' 鍵的值必須是一個字典。")
+
+        # 6. 使用驗證過的資料，透過 `cls()` (即 ConfigurationManager) 創建並回傳實例
+        return cls(validated_fields, settings)
 
     # --- 公開介面 (Public Interface) ---
 
@@ -126,4 +134,10 @@ class ConfigurationManager:
         根據欄位 ID 獲取特定的欄位設定。
         """
         field = self._fields_by_id.get(field_id)
-        return field.copy() if field else None # type: ignore
\ No newline at end of file
+        return field.copy() if field else None # type: ignore
+
+    def get_setting(self, key: str, default: Any = None) -> Any:
+        """
+        根據鍵名獲取 'settings' 區塊中的設定值，未設定時回傳 default。
+        """
+        return self._settings.get(key, default)
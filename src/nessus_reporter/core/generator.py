@@ -2,17 +2,75 @@
 
 import pandas as pd
 import logging
+import itertools
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Any, Iterable, Iterator, Tuple
 
-from openpyxl.worksheet.worksheet import Worksheet
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils import get_column_letter
 
+from .config_manager import FieldConfig
+from .parser import LazyTextResolver, LAZY_REF_COLUMNS, is_lazy_field
+
 class ReportGenerationError(Exception):
     """當生成報告過程中發生錯誤時引發的基礎類別。"""
     pass
 
+def resolve_report_columns(
+    available_columns: List[str],
+    selected_columns: List[str],
+    fields_config: Optional[List[FieldConfig]]
+) -> Tuple[List[str], List[str], bool]:
+    """
+    決定報告最終要寫出的欄位（供各種報告生成器共用）。
+
+    Returns:
+        Tuple: (要寫出的欄位, 需要從資料中取出的欄位, 是否需要回讀 lazy 欄位)。
+    """
+    lazy_columns: List[str] = []
+    if fields_config and all(col in available_columns for col in LAZY_REF_COLUMNS):
+        lazy_columns = [f['displayName'] for f in fields_config if is_lazy_field(f)]
+
+    final_columns = [col for col in selected_columns if col in available_columns or col in lazy_columns]
+    needs_resolver = any(col in lazy_columns for col in final_columns)
+    source_columns = [col for col in final_columns if col in available_columns]
+    if needs_resolver:
+        source_columns += LAZY_REF_COLUMNS
+    return final_columns, source_columns, needs_resolver
+
+def iter_chunk_batches(
+    chunks: Iterable[pd.DataFrame],
+    selected_columns: List[str],
+    fields_config: Optional[List[FieldConfig]]
+) -> Optional[Tuple[List[str], bool, Iterator[pd.DataFrame]]]:
+    """
+    將一連串 DataFrame 區塊對齊到相同的欄位（供串流式報告生成器共用）。
+    欄位以 `fields_config` 中定義的欄位為準（未提供時以第一個非空區塊的欄位為準）。
+
+    Returns:
+        Optional[Tuple]: (要寫出的欄位, 是否需要回讀 lazy 欄位, 對齊後的批次迭代器)；
+        沒有任何資料時回傳 None。
+    """
+    chunk_iter = iter(chunks)
+    first_chunk = next((chunk for chunk in chunk_iter if not chunk.empty), None)
+    if first_chunk is None:
+        return None
+
+    available_columns = list(first_chunk.columns)
+    if fields_config:
+        available_columns += [
+            f['displayName'] for f in fields_config
+            if f['displayName'] not in available_columns and not is_lazy_field(f)
+        ]
+
+    final_columns, source_columns, needs_resolver = resolve_report_columns(
+        available_columns, selected_columns, fields_config
+    )
+    batches = (chunk.reindex(columns=source_columns) for chunk in itertools.chain([first_chunk], chunk_iter))
+    return final_columns, needs_resolver, batches
+
 class ExcelReportGenerator:
     """
     負責將 pandas DataFrame 生成為格式精美的 Excel 檔案。
@@ -24,62 +82,152 @@ class ExcelReportGenerator:
     HEADER_FILL = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
     HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
     FREEZE_PANE_CELL = "A2"
+    # Excel 單一儲存格最多可容納的字元數
+    CELL_CHAR_LIMIT = 32767
+    # Excel 允許的最大欄寬
+    MAX_COLUMN_WIDTH = 255
+    # 每批寫出的資料列數；lazy 欄位也以此批次大小回讀
+    WRITE_BATCH_ROWS = 5000
 
     @staticmethod
-    def _apply_styles(worksheet: Worksheet) -> None:
-        """私有輔助方法：統一應用所有靜態格式（標頭、凍結窗格、篩選器）。"""
-        # 1. 格式化標頭
-        for cell in worksheet[1]:
+    def _header_cells(worksheet: Any, final_columns: List[str]) -> List[WriteOnlyCell]:
+        """私有輔助方法：建立套用標頭格式的標頭列。"""
+        cells = []
+        for col_name in final_columns:
+            cell = WriteOnlyCell(worksheet, value=col_name)
             cell.font = ExcelReportGenerator.HEADER_FONT
             cell.fill = ExcelReportGenerator.HEADER_FILL
             cell.alignment = ExcelReportGenerator.HEADER_ALIGNMENT
-        
-        # 2. 凍結首行
-        worksheet.freeze_panes = ExcelReportGenerator.FREEZE_PANE_CELL
-        
-        # 3. 增加自動篩選器
-        worksheet.auto_filter.ref = worksheet.dimensions
+            cells.append(cell)
+        return cells
+
+    @staticmethod
+    def _cell_value(value: Any) -> Any:
+        """私有輔助方法：將 DataFrame 中的空值轉為空白儲存格。"""
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            return None
+        return value
+
+    @staticmethod
+    def _truncate_cells(df: pd.DataFrame) -> pd.DataFrame:
+        """私有輔助方法：將超過 Excel 儲存格上限的文字截斷，避免寫出失敗或檔案損毀。"""
+        limit = ExcelReportGenerator.CELL_CHAR_LIMIT
+        df = df.copy()
+        for col_name in df.columns:
+            if df[col_name].dtype == object:
+                df[col_name] = df[col_name].map(
+                    lambda v: v[:limit] if isinstance(v, str) and len(v) > limit else v
+                )
+        return df
 
     @staticmethod
     def generate_report(
         df: pd.DataFrame, 
         selected_columns: List[str], 
-        output_path: Path
+        output_path: Path,
+        fields_config: Optional[List[FieldConfig]] = None
     ) -> None:
         """
         接收 DataFrame，篩選指定欄位，並生成一個格式化的 Excel 報告。
+
+        若 DataFrame 是以 lazy 模式解析的，需同時傳入 `fields_config`，
+        大型文字欄位會在分批寫出時才從原始檔案讀回。
         """
         if df.empty:
             logging.info("傳入的 DataFrame 為空，已跳過生成報告。")
             return
-            
-        final_columns = [col for col in selected_columns if col in df.columns]
+
+        final_columns, source_columns, needs_resolver = resolve_report_columns(
+            list(df.columns), selected_columns, fields_config
+        )
+        if not final_columns:
+            logging.warning("沒有有效的欄位被選取，已跳過生成報告。")
+            return
+
+        report_df = df[source_columns]
+        batches = (
+            report_df.iloc[start:start + ExcelReportGenerator.WRITE_BATCH_ROWS]
+            for start in range(0, len(report_df), ExcelReportGenerator.WRITE_BATCH_ROWS)
+        )
+        ExcelReportGenerator._write_batches(batches, final_columns, needs_resolver, output_path, fields_config)
+
+    @staticmethod
+    def generate_report_from_chunks(
+        chunks: Iterable[pd.DataFrame],
+        selected_columns: List[str],
+        output_path: Path,
+        fields_config: Optional[List[FieldConfig]] = None
+    ) -> None:
+        """
+        以串流方式生成 Excel 報告：逐一寫出傳入的 DataFrame 區塊（例如外部排序的結果），
+        不會把所有資料同時載入記憶體。
+
+        欄位以 `fields_config` 中定義的欄位為準（未提供時以第一個區塊的欄位為準），
+        某些區塊缺少的欄位會以空值補齊。
+        """
+        prepared = iter_chunk_batches(chunks, selected_columns, fields_config)
+        if prepared is None:
+            logging.info("沒有任何資料區塊，已跳過生成報告。")
+            return
+
+        final_columns, needs_resolver, batches = prepared
         if not final_columns:
             logging.warning("沒有有效的欄位被選取，已跳過生成報告。")
             return
-            
-        report_df = df[final_columns]
 
+        ExcelReportGenerator._write_batches(batches, final_columns, needs_resolver, output_path, fields_config)
+
+    @staticmethod
+    def _write_batches(
+        batches: Iterable[pd.DataFrame],
+        final_columns: List[str],
+        needs_resolver: bool,
+        output_path: Path,
+        fields_config: Optional[List[FieldConfig]]
+    ) -> None:
+        """
+        私有方法：以 openpyxl 的 write-only 模式將資料批次依序寫入同一個工作表。
+        write-only 模式不會在記憶體中保留已寫出的儲存格，因此峰值記憶體只取決於單一批次的大小。
+        欄寬必須在寫入第一列之前設定，因此依第一個批次的內容估算。
+        """
         try:
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                report_df.to_excel(writer, sheet_name=ExcelReportGenerator.SHEET_NAME, index=False)
-                worksheet = writer.sheets[ExcelReportGenerator.SHEET_NAME]
-
-                # [優化] 使用更高效能的方式計算並設定欄寬
-                for i, col_name in enumerate(report_df.columns, 1):
-                    # 計算標頭和內容的最大長度
-                    # .astype(str).map(len) 是高效的向量化操作
-                    max_len_content = report_df[col_name].astype(str).map(len).max()
-                    max_len_header = len(col_name)
-                    max_len = max(max_len_content, max_len_header)
-                    
-                    # 設定欄寬
-                    adjusted_width = (max_len + 2)
-                    col_letter = get_column_letter(i)
-                    worksheet.column_dimensions[col_letter].width = adjusted_width
-                
-                # 套用其他靜態格式
-                ExcelReportGenerator._apply_styles(worksheet)
+            workbook = Workbook(write_only=True)
+            worksheet = workbook.create_sheet(ExcelReportGenerator.SHEET_NAME)
+
+            with LazyTextResolver(fields_config or []) as resolver:
+                # 分批準備資料，lazy 欄位只在其所屬的批次中被讀回
+                prepared = (
+                    ExcelReportGenerator._truncate_cells(
+                        (resolver.materialize(batch) if needs_resolver else batch)[final_columns]
+                    )
+                    for batch in batches if not batch.empty
+                )
+                first_batch = next(prepared, None)
+
+                # 設定欄寬
+                for i, col_name in enumerate(final_columns, 1):
+                    max_len = len(col_name)
+                    if first_batch is not None:
+                        # [優化] 使用向量化操作計算每個欄位內容的最大長度
+                        max_len = max(max_len, first_batch[col_name].astype(str).map(len).max())
+                    worksheet.column_dimensions[get_column_letter(i)].width = min(
+                        max_len + 2, ExcelReportGenerator.MAX_COLUMN_WIDTH
+                    )
+
+                # 凍結首行並寫出標頭
+                worksheet.freeze_panes = ExcelReportGenerator.FREEZE_PANE_CELL
+                worksheet.append(ExcelReportGenerator._header_cells(worksheet, final_columns))
+                row_count = 1
+
+                if first_batch is not None:
+                    for batch in itertools.chain([first_batch], prepared):
+                        for values in batch.itertuples(index=False, name=None):
+                            worksheet.append([ExcelReportGenerator._cell_value(v) for v in values])
+                        row_count += len(batch)
+
+            # 增加自動篩選器
+            worksheet.auto_filter.ref = f"A1:{get_column_letter(len(final_columns))}{row_count}"
+            workbook.save(output_path)
 
         except PermissionError:
             raise ReportGenerationError(f"無法寫入檔案，請確認 '{output_path.name}' 沒有被其他程式打開。")
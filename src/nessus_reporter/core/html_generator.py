@@ -0,0 +1,392 @@
+# src/nessus_reporter/core/html_generator.py
+
+import html
+import json
+import logging
+from urllib.parse import quote
+import pandas as pd
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Type, Union
+
+from .config_manager import FieldConfig
+from .parser import LazyTextResolver
+from .generator import ExcelReportGenerator, ReportGenerationError, resolve_report_columns, iter_chunk_batches
+
+class HtmlReportGenerator:
+    """
+    負責將資料生成為可分頁瀏覽的靜態 HTML 報告，適用於 Excel 無法負荷的大量資料。
+
+    輸出包含一個 `.html` 檢視頁面，以及同名 `_data` 資料夾中的多個資料區塊檔。
+    每個區塊檔是固定筆數的資料（JSON 陣列，包裝成 JS 呼叫以便直接用 file:// 開啟），
+    瀏覽器只會在需要時才載入它。清單檔只記錄每個區塊各風險等級的筆數與主機的範圍（最小值與最大值），
+    其大小與區塊數成正比，而不隨主機數增加。
+    檢視頁面以「符合篩選條件的資料列」分頁：只篩選風險等級時可直接由筆數定位頁面，
+    篩選主機（前綴比對）時則只載入主機範圍可能符合的區塊。
+    資料以串流方式逐區塊寫出，生成成本與資料量成線性關係。
+    """
+    ROWS_PER_CHUNK = 1000
+    # 檢視頁面每頁顯示的資料列數
+    PAGE_SIZE = 1000
+    DATA_DIR_SUFFIX = '_data'
+    MANIFEST_FILE = 'manifest.js'
+    # 用來提供篩選功能的欄位 id
+    SEVERITY_FIELD_ID = 'severity'
+    HOST_FIELD_ID = 'host_ip'
+
+    @staticmethod
+    def _data_dir(output_path: Path) -> Path:
+        return output_path.with_name(output_path.stem + HtmlReportGenerator.DATA_DIR_SUFFIX)
+
+    @staticmethod
+    def _to_json_value(value: Any) -> Any:
+        """私有輔助方法：將儲存格的值轉換為可序列化的 JSON 值（空值轉為 null）。"""
+        if value is None or (isinstance(value, float) and pd.isna(value)):
+            return None
+        if isinstance(value, (str, int, float, bool)):
+            return value
+        return str(value)
+
+    @staticmethod
+    def _filter_key(value: Any) -> str:
+        """私有輔助方法：篩選值在清單中的鍵，與檢視頁面的 `String(value)` 一致。"""
+        return 'null' if value is None else str(value)
+
+    @staticmethod
+    def generate_report(
+        df: pd.DataFrame,
+        selected_columns: List[str],
+        output_path: Path,
+        fields_config: Optional[List[FieldConfig]] = None
+    ) -> None:
+        """
+        接收 DataFrame，篩選指定欄位，並生成一個分頁式的 HTML 報告。
+        """
+        if df.empty:
+            logging.info("傳入的 DataFrame 為空，已跳過生成報告。")
+            return
+
+        final_columns, source_columns, needs_resolver = resolve_report_columns(
+            list(df.columns), selected_columns, fields_config
+        )
+        if not final_columns:
+            logging.warning("沒有有效的欄位被選取，已跳過生成報告。")
+            return
+
+        report_df = df[source_columns]
+        batches = (
+            report_df.iloc[start:start + HtmlReportGenerator.ROWS_PER_CHUNK]
+            for start in range(0, len(report_df), HtmlReportGenerator.ROWS_PER_CHUNK)
+        )
+        HtmlReportGenerator._write_batches(batches, final_columns, needs_resolver, output_path, fields_config)
+
+    @staticmethod
+    def generate_report_from_chunks(
+        chunks: Iterable[pd.DataFrame],
+        selected_columns: List[str],
+        output_path: Path,
+        fields_config: Optional[List[FieldConfig]] = None
+    ) -> None:
+        """
+        以串流方式生成 HTML 報告：逐一寫出傳入的 DataFrame 區塊（例如外部排序的結果），
+        不會把所有資料同時載入記憶體。
+        """
+        prepared = iter_chunk_batches(chunks, selected_columns, fields_config)
+        if prepared is None:
+            logging.info("沒有任何資料區塊，已跳過生成報告。")
+            return
+
+        final_columns, needs_resolver, batches = prepared
+        if not final_columns:
+            logging.warning("沒有有效的欄位被選取，已跳過生成報告。")
+            return
+
+        HtmlReportGenerator._write_batches(batches, final_columns, needs_resolver, output_path, fields_config)
+
+    @staticmethod
+    def _write_batches(
+        batches: Iterable[pd.DataFrame],
+        final_columns: List[str],
+        needs_resolver: bool,
+        output_path: Path,
+        fields_config: Optional[List[FieldConfig]]
+    ) -> None:
+        """私有方法：將資料批次重新切成固定大小的區塊寫出，最後寫出清單檔與檢視頁面。"""
+        display_names = {f['id']: f['displayName'] for f in fields_config or []}
+        severity_col = display_names.get(HtmlReportGenerator.SEVERITY_FIELD_ID)
+        host_col = display_names.get(HtmlReportGenerator.HOST_FIELD_ID)
+        severity_idx = final_columns.index(severity_col) if severity_col in final_columns else None
+        host_idx = final_columns.index(host_col) if host_col in final_columns else None
+
+        data_dir = HtmlReportGenerator._data_dir(output_path)
+        chunk_summaries: List[Dict[str, Any]] = []
+        severity_values: List[str] = []
+        pending_rows: List[List[Any]] = []
+
+        def flush(rows: List[List[Any]]) -> None:
+            index = len(chunk_summaries)
+            severity_counts: Dict[str, int] = {}
+            host_range: Optional[List[str]] = None
+            for row in rows:
+                if severity_idx is not None:
+                    key = HtmlReportGenerator._filter_key(row[severity_idx])
+                    severity_counts[key] = severity_counts.get(key, 0) + 1
+                if host_idx is not None and row[host_idx] is not None:
+                    host = str(row[host_idx]).lower()
+                    host_range = [min(host_range[0], host), max(host_range[1], host)] if host_range else [host, host]
+            for severity in severity_counts:
+                if severity not in severity_values:
+                    severity_values.append(severity)
+
+            payload = json.dumps(rows, ensure_ascii=False, separators=(',', ':'))
+            with open(data_dir / f"chunk_{index:05d}.js", 'w', encoding='utf-8') as f:
+                f.write(f"nessusReport.addChunk({index},{payload});\n")
+            chunk_summaries.append({
+                "rows": len(rows),
+                "severityCounts": severity_counts,
+                "hostRange": host_range,
+            })
+
+        try:
+            # 清除上一次生成時留下的區塊檔，避免新舊資料混雜
+            data_dir.mkdir(parents=True, exist_ok=True)
+            for stale_file in data_dir.glob('chunk_*.js'):
+                stale_file.unlink()
+
+            with LazyTextResolver(fields_config or []) as resolver:
+                for batch in batches:
+                    if batch.empty:
+                        continue
+                    if needs_resolver:
+                        batch = resolver.materialize(batch)
+                    for values in batch[final_columns].itertuples(index=False, name=None):
+                        pending_rows.append([HtmlReportGenerator._to_json_value(v) for v in values])
+                        if len(pending_rows) >= HtmlReportGenerator.ROWS_PER_CHUNK:
+                            flush(pending_rows)
+                            pending_rows = []
+                if pending_rows:
+                    flush(pending_rows)
+
+            manifest = {
+                "title": output_path.stem,
+                "columns": final_columns,
+                "totalRows": sum(chunk["rows"] for chunk in chunk_summaries),
+                "pageSize": HtmlReportGenerator.PAGE_SIZE,
+                "severityIndex": severity_idx,
+                "hostIndex": host_idx,
+                "severityValues": severity_values,
+                "chunks": chunk_summaries,
+            }
+            with open(data_dir / HtmlReportGenerator.MANIFEST_FILE, 'w', encoding='utf-8') as f:
+                f.write(f"nessusReport.init({json.dumps(manifest, ensure_ascii=False, separators=(',', ':'))});\n")
+
+            page = _VIEWER_TEMPLATE.replace('__TITLE__', html.escape(output_path.stem)) \
+                .replace('__DATA_DIR__', quote(data_dir.name))
+            output_path.write_text(page, encoding='utf-8')
+
+        except PermissionError:
+            raise ReportGenerationError(f"無法寫入檔案，請確認 '{output_path.name}' 或其資料夾沒有被其他程式使用。")
+        except Exception as e:
+            raise ReportGenerationError(f"生成 HTML 報告時發生未預期的錯誤: {e}") from e
+
+def report_generator_for(output_path: Path) -> Union[Type[ExcelReportGenerator], Type[HtmlReportGenerator]]:
+    """依輸出檔的副檔名選擇報告生成器：`.html`/`.htm` 使用 HTML 報告，其餘使用 Excel 報告。"""
+    if output_path.suffix.lower() in ('.html', '.htm'):
+        return HtmlReportGenerator
+    return ExcelReportGenerator
+
+# 靜態檢視頁面：依需求載入資料區塊，並以符合風險等級與主機篩選條件的資料列分頁
+_VIEWER_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-Hant">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+  body { font-family: Calibri, "Microsoft JhengHei", sans-serif; margin: 16px; }
+  #toolbar { display: flex; gap: 12px; align-items: center; margin-bottom: 12px; flex-wrap: wrap; }
+  table { border-collapse: collapse; width: 100%; font-size: 13px; }
+  th { background: #4F81BD; color: #FFFFFF; position: sticky; top: 0; padding: 6px; }
+  td { border: 1px solid #D0D7E5; padding: 4px 6px; vertical-align: top; white-space: pre-wrap; }
+  tr:nth-child(even) td { background: #F2F5FA; }
+  #status { color: #555555; }
+</style>
+</head>
+<body>
+<div id="toolbar">
+  <label>風險等級 <select id="severity"><option value="">全部</option></select></label>
+  <label>主機 <input id="host" type="search" placeholder="IP 或前綴，例如 10.0.1."></label>
+  <button id="prev">上一頁</button>
+  <span id="page"></span>
+  <button id="next">下一頁</button>
+  <span id="status"></span>
+</div>
+<table><thead id="head"></thead><tbody id="body"></tbody></table>
+<script>
+var nessusReport = (function () {
+  var DATA_DIR = "__DATA_DIR__/";
+  var CACHE_LIMIT = 8;
+  var manifest = null, cache = {}, cacheOrder = [], waiting = {};
+  // candidates: 可能含有符合資料的區塊；counts: 已知的各區塊符合筆數（篩選條件變更時重設）
+  var candidates = [], counts = {}, page = 0, generation = 0;
+
+  function chunkFile(i) { return DATA_DIR + "chunk_" + ("0000" + i).slice(-5) + ".js"; }
+
+  function loadChunk(i) {
+    if (cache[i]) { return Promise.resolve(cache[i]); }
+    return new Promise(function (resolve, reject) {
+      waiting[i] = resolve;
+      var script = document.createElement("script");
+      script.src = chunkFile(i);
+      script.onerror = function () { reject(new Error("無法載入 " + chunkFile(i))); };
+      script.onload = function () { script.remove(); };
+      document.body.appendChild(script);
+    });
+  }
+
+  function filters() {
+    return {
+      severity: manifest.severityIndex === null ? "" : document.getElementById("severity").value,
+      host: manifest.hostIndex === null ? "" : document.getElementById("host").value.trim().toLowerCase()
+    };
+  }
+
+  function rowMatches(row, f) {
+    if (f.severity && String(row[manifest.severityIndex]) !== f.severity) { return false; }
+    if (f.host && (row[manifest.hostIndex] === null || String(row[manifest.hostIndex]).toLowerCase().indexOf(f.host) !== 0)) { return false; }
+    return true;
+  }
+
+  function chunkMayMatch(chunk, f) {
+    if (f.severity && !chunk.severityCounts[f.severity]) { return false; }
+    if (f.host) {
+      var range = chunk.hostRange;
+      // 主機以前綴比對：區塊的主機範圍必須與 [前綴, 前綴 + 最大字元] 有交集
+      if (!range || range[1] < f.host || range[0] > f.host + "\\uffff") { return false; }
+    }
+    return true;
+  }
+
+  function knownCount(i, f) {
+    if (counts[i] !== undefined) { return counts[i]; }
+    if (f.host) { return undefined; }
+    var chunk = manifest.chunks[i];
+    return f.severity ? chunk.severityCounts[f.severity] : chunk.rows;
+  }
+
+  function applyFilters() {
+    var f = filters();
+    candidates = [];
+    counts = {};
+    manifest.chunks.forEach(function (chunk, i) { if (chunkMayMatch(chunk, f)) { candidates.push(i); } });
+    page = 0;
+    render();
+  }
+
+  function render() {
+    var f = filters(), current = ++generation;
+    var start = page * manifest.pageSize, end = start + manifest.pageSize;
+    var collected = [], offset = 0, k = 0;
+    document.getElementById("prev").disabled = true;
+    document.getElementById("next").disabled = true;
+    document.getElementById("status").textContent = "載入中...";
+
+    function step() {
+      if (current !== generation) { return; }
+      // 已知筆數且整個區塊都在本頁之前者，直接略過而不載入
+      while (k < candidates.length && collected.length < manifest.pageSize) {
+        var known = knownCount(candidates[k], f);
+        if (known === undefined || offset + known > start) { break; }
+        offset += known;
+        k += 1;
+      }
+      if (k >= candidates.length || collected.length >= manifest.pageSize) { show(collected, f); return; }
+
+      var i = candidates[k];
+      k += 1;
+      loadChunk(i).then(function (rows) {
+        if (current !== generation) { return; }
+        var matched = 0;
+        rows.forEach(function (row) {
+          if (!rowMatches(row, f)) { return; }
+          if (offset >= start && offset < end) { collected.push(row); }
+          offset += 1;
+          matched += 1;
+        });
+        counts[i] = matched;
+        step();
+      }, function (err) {
+        document.getElementById("status").textContent = err.message;
+      });
+    }
+    step();
+  }
+
+  function show(rows, f) {
+    var body = document.getElementById("body"), fragment = document.createDocumentFragment();
+    rows.forEach(function (row) {
+      var tr = document.createElement("tr");
+      row.forEach(function (value) {
+        var td = document.createElement("td");
+        td.textContent = value === null ? "" : String(value);
+        tr.appendChild(td);
+      });
+      fragment.appendChild(tr);
+    });
+    body.textContent = "";
+    body.appendChild(fragment);
+
+    // 所有候選區塊的筆數都已知時，才能得出總頁數
+    var total = 0;
+    for (var n = 0; n < candidates.length && total !== undefined; n++) {
+      var known = knownCount(candidates[n], f);
+      total = known === undefined ? undefined : total + known;
+    }
+    var first = page * manifest.pageSize;
+    var pages = total === undefined ? "?" : Math.max(1, Math.ceil(total / manifest.pageSize));
+    var hasNext = total === undefined ? rows.length >= manifest.pageSize : first + rows.length < total;
+    document.getElementById("page").textContent = (page + 1) + " / " + pages;
+    document.getElementById("prev").disabled = page <= 0;
+    document.getElementById("next").disabled = !hasNext;
+    document.getElementById("status").textContent = rows.length
+      ? "第 " + (first + 1) + "-" + (first + rows.length) + " 筆，" +
+        (total === undefined ? "符合筆數計算中" : "共 " + total + " 筆符合") + "（全部 " + manifest.totalRows + " 筆）"
+      : "沒有符合條件的資料";
+  }
+
+  return {
+    init: function (m) {
+      manifest = m;
+      document.title = m.title;
+      var head = document.createElement("tr");
+      m.columns.forEach(function (name) {
+        var th = document.createElement("th");
+        th.textContent = name;
+        head.appendChild(th);
+      });
+      document.getElementById("head").appendChild(head);
+      var select = document.getElementById("severity");
+      if (m.severityIndex === null) { select.parentNode.style.display = "none"; }
+      if (m.hostIndex === null) { document.getElementById("host").parentNode.style.display = "none"; }
+      m.severityValues.forEach(function (value) {
+        var option = document.createElement("option");
+        option.value = option.textContent = value;
+        select.appendChild(option);
+      });
+      select.onchange = applyFilters;
+      document.getElementById("host").oninput = applyFilters;
+      document.getElementById("prev").onclick = function () { page -= 1; render(); };
+      document.getElementById("next").onclick = function () { page += 1; render(); };
+      applyFilters();
+    },
+    addChunk: function (i, rows) {
+      cache[i] = rows;
+      cacheOrder.push(i);
+      while (cacheOrder.length > CACHE_LIMIT) { delete cache[cacheOrder.shift()]; }
+      if (waiting[i]) { waiting[i](rows); delete waiting[i]; }
+    }
+  };
+})();
+</script>
+<script src="__DATA_DIR__/manifest.js"></script>
+</body>
+</html>
+"""
@@ -0,0 +1,167 @@
+# src/nessus_reporter/core/incremental.py
+
+import json
+import hashlib
+import os
+import re
+import zipfile
+import pandas as pd
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+from .sources import NessusSource
+from .generator import ExcelReportGenerator
+
+class IncrementalError(Exception):
+    """當增量更新（監看模式）發生錯誤時引發的基礎類別。"""
+    pass
+
+@dataclass
+class IncrementalUpdateResult:
+    """存放一次增量更新結果的資料類別。"""
+    added: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    rows_written: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+class ProcessedManifest:
+    """
+    記錄已處理過的資料來源（一般檔案以大小與修改時間、zip 成員以其 CRC、大小與成員時間識別）
+    及其對應的輸出分區，
+    以及產生這些分區時使用的輸出格式與欄位。
+    清單以 JSON 檔儲存在輸出目錄中，讓監看模式在重新啟動後也能接續運作。
+    """
+    FILE_NAME = 'processed_manifest.json'
+
+    def __init__(
+        self, path: Path,
+        entries: Optional[Dict[str, Dict[str, Any]]] = None,
+        output: Optional[Dict[str, Any]] = None
+    ):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = entries or {}
+        self.output: Dict[str, Any] = output or {}
+        # 每個 zip 壓縮檔的成員資訊，以壓縮檔的大小與修改時間為快取鍵，避免逐一成員重複讀取目錄
+        self._zip_infos: Dict[Path, Tuple[Tuple[int, float], Dict[str, zipfile.ZipInfo]]] = {}
+
+    @classmethod
+    def load(cls, output_dir: Path) -> 'ProcessedManifest':
+        """從輸出目錄讀取清單；若不存在則回傳空清單。"""
+        path = output_dir / cls.FILE_NAME
+        if not path.is_file():
+            return cls(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(path, data.get('sources', {}), data.get('output', {}))
+        except (IOError, json.JSONDecodeError, AttributeError) as e:
+            raise IncrementalError(f"無法讀取處理清單 {path}: {e}") from e
+
+    def save(self) -> None:
+        """先寫入暫存檔再改名，避免中斷時留下損毀的清單。"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'output': self.output, 'sources': self.entries}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def signature(self, source: NessusSource) -> Dict[str, Any]:
+        """
+        資料來源的變動識別。zip 成員只看自身的資訊，
+        因此在壓縮檔中新增或更新其他成員時，既有成員不會被視為已變動。
+
+        Raises:
+            OSError, zipfile.BadZipFile, KeyError: 如果來源無法讀取或成員已不存在。
+        """
+        stat = source.path.stat()
+        if not source.member:
+            return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+        cache_key = (stat.st_size, stat.st_mtime)
+        cached = self._zip_infos.get(source.path)
+        if cached is None or cached[0] != cache_key:
+            with zipfile.ZipFile(source.path) as archive:
+                cached = (cache_key, {info.filename: info for info in archive.infolist()})
+            self._zip_infos[source.path] = cached
+        info = cached[1].get(source.member)
+        if info is None:
+            raise KeyError(f"壓縮檔中沒有成員 {source.member}")
+        year, month, day, hour, minute, second = info.date_time
+        return {
+            'size': info.file_size,
+            'mtime': f"{year:04d}-{month:02d}-{day:02d}T{hour:02d}:{minute:02d}:{second:02d}",
+            'crc': info.CRC,
+        }
+
+    def is_current(self, source: NessusSource) -> bool:
+        """判斷資料來源自上次處理後是否未曾變動。"""
+        entry = self.entries.get(str(source))
+        if entry is None:
+            return False
+        signature = self.signature(source)
+        return all(entry.get(key) == value for key, value in signature.items())
+
+    def matches_output(self, output_format: str, columns: List[str]) -> bool:
+        """判斷清單中的分區是否以相同的輸出格式與欄位產生。"""
+        return self.output == {'format': output_format, 'columns': list(columns)}
+
+    def set_output(self, output_format: str, columns: List[str]) -> None:
+        self.output = {'format': output_format, 'columns': list(columns)}
+
+    def invalidate(self, key: str) -> None:
+        """讓某個來源在下次更新時被重新處理；其分區紀錄會保留，以便屆時清除舊分區。"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            entry['size'] = entry['mtime'] = None
+
+    def record(self, source: NessusSource, partition: Optional[Path], rows: int) -> None:
+        """記錄一個已處理的資料來源；分區路徑以相對於輸出目錄的形式儲存。"""
+        self.entries[str(source)] = {
+            **self.signature(source),
+            'partition': partition.relative_to(self.path.parent).as_posix() if partition else None,
+            'rows': rows,
+        }
+
+class PartitionWriter:
+    """
+    將每個資料來源的結果寫成輸出目錄中的一個獨立分區檔。
+    新增的來源只會新增分區，變動的來源只會重寫其自身的分區，
+    因此每次更新的成本只取決於新資料量，而不是全部歷史資料。
+    """
+    SUPPORTED_FORMATS = ('csv', 'xlsx')
+    PARTITION_DIR = 'partitions'
+
+    def __init__(self, output_dir: Path, output_format: str, selected_columns: List[str]):
+        if output_format not in self.SUPPORTED_FORMATS:
+            raise IncrementalError(f"不支援的輸出格式: '{output_format}'，可用格式: {', '.join(self.SUPPORTED_FORMATS)}")
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.selected_columns = selected_columns
+
+    def partition_path(self, source: NessusSource) -> Path:
+        """依資料來源產生穩定且安全的分區檔名（可讀名稱加上路徑雜湊，避免同名衝突）。"""
+        readable = re.sub(r'[^\w.-]+', '_', source.name)
+        digest = hashlib.sha1(str(source).encode('utf-8')).hexdigest()[:10]
+        return self.output_dir / self.PARTITION_DIR / f"{readable}-{digest}.{self.output_format}"
+
+    def write(self, source: NessusSource, df: pd.DataFrame) -> Path:
+        """寫入（或覆寫）某個資料來源的分區，回傳分區檔路徑。"""
+        target = self.partition_path(source)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        columns = [col for col in self.selected_columns if col in df.columns]
+
+        if self.output_format == 'xlsx':
+            ExcelReportGenerator.generate_report(df, columns, target)
+        else:
+            df[columns].to_csv(target, index=False, encoding='utf-8-sig')
+        return target
+
+    def remove(self, partition: str) -> None:
+        """刪除一個分區檔（來源檔案被移除或已無資料時）；`partition` 為相對於輸出目錄的路徑。"""
+        (self.output_dir / partition).unlink(missing_ok=True)
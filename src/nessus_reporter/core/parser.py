@@ -3,16 +3,34 @@
 from lxml import etree
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Any, Iterator
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Iterator, Union, Tuple, Optional
+from collections import OrderedDict
 import itertools
 
 # 導入我們需要的型別和錯誤類別
 from .config_manager import FieldConfig, ConfigError
+from .sources import NessusSource
 
 class ParsingError(Exception):
     """當解析過程中發生錯誤時引發的基礎類別。"""
     pass
 
+# lazy 模式下，用來記錄資料來源與 ReportItem 序號的內部欄位
+SOURCE_REF_COLUMN = '__source__'
+ITEM_INDEX_COLUMN = '__item_index__'
+LAZY_REF_COLUMNS = [SOURCE_REF_COLUMN, ITEM_INDEX_COLUMN]
+
+# 供弱點資料庫使用的內部欄位：該筆資料所屬主機的掃描時間（ISO 格式）
+SCAN_TIME_COLUMN = '__scan_time__'
+# 依序嘗試的 HostProperties 標籤；*_TIMESTAMP 為 epoch 秒數，其餘為 Nessus 的文字時間格式
+SCAN_TIME_TAGS = ('HOST_START_TIMESTAMP', 'HOST_START', 'HOST_END_TIMESTAMP', 'HOST_END')
+NESSUS_TIME_FORMAT = '%a %b %d %H:%M:%S %Y'
+
+def is_lazy_field(field: FieldConfig) -> bool:
+    """判斷一個欄位是否被標記為 lazy（只有 ReportItem 層級的欄位支援）。"""
+    return bool(field.get('lazy')) and field['source_tag'] == 'ReportItem'
+
 class ConfigurableDataParser:
     """
     一個通用的、由設定檔驅動的 XML 解析器。
@@ -35,15 +53,51 @@ class ConfigurableDataParser:
         return data
 
     @staticmethod
-    def _iter_parsed_rows(file_path: Path, host_fields: List[FieldConfig], item_fields: List[FieldConfig]) -> Iterator[Dict[str, Any]]:
+    def _extract_scan_time(host_node: etree._Element) -> Optional[str]:
+        """私有輔助方法：從 ReportHost 的 HostProperties 取出掃描時間，無法取得時回傳 None。"""
+        for tag in SCAN_TIME_TAGS:
+            results = host_node.xpath(f"./HostProperties/tag[@name='{tag}']/text()")
+            if not results:
+                continue
+            text = str(results[0]).strip()
+            try:
+                if tag.endswith('_TIMESTAMP'):
+                    scan_time = datetime.fromtimestamp(int(float(text)))
+                else:
+                    scan_time = datetime.strptime(text, NESSUS_TIME_FORMAT)
+            except (ValueError, OverflowError, OSError):
+                continue
+            return scan_time.isoformat(timespec='seconds')
+        return None
+
+    @staticmethod
+    def _iter_parsed_rows(source: NessusSource, host_fields: List[FieldConfig], item_fields: List[FieldConfig], with_index: bool = False, with_scan_time: bool = False, on_read: Optional[Callable[[int], None]] = None) -> Iterator[Dict[str, Any]]:
         """
         [優化] 這是一個生成器函式。
         它負責迭代解析 XML，並逐一 `yield` (產出) 處理好的單筆資料。
+        壓縮來源會被即時解壓並直接串流給 iterparse。
         """
-        current_host_ip: str | None = None
-        current_host_data: Dict[str, Any] = {}
+        with source.open(on_read) as stream:
+            yield from ConfigurableDataParser._iter_rows_from_stream(stream, host_fields, item_fields, with_index, with_scan_time)
+
+    @staticmethod
+    def iter_item_values(source: NessusSource, item_fields: List[FieldConfig]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        依序回讀一個資料來源，產出每個 ReportItem 的 (序號, 指定欄位資料)。
+        供 lazy 模式在寫出報告時取回大型文字欄位使用。
+        """
+        with source.open() as stream:
+            for item_index, _, report_item in ConfigurableDataParser._iter_report_items(stream):
+                yield item_index, ConfigurableDataParser._extract_data(report_item, item_fields)
 
-        context = etree.iterparse(str(file_path), events=('end',), tag='ReportItem')
+    @staticmethod
+    def _iter_report_items(stream) -> Iterator[Tuple[int, etree._Element, etree._Element]]:
+        """
+        私有的生成器：逐一產出 (序號, ReportHost, ReportItem)。
+        序號只計算位於 ReportHost 底下的 ReportItem，是 lazy 模式回讀資料時的定位依據。
+        """
+        context = etree.iterparse(stream, events=('end',), tag='ReportItem')
+        item_index = 0
 
         for event, report_item in context:
             try:
@@ -51,16 +105,8 @@ class ConfigurableDataParser:
                 if host_node is None or host_node.tag != 'ReportHost':
                     continue
 
-                ip = host_node.get('name')
-
-                if ip != current_host_ip:
-                    current_host_ip = ip
-                    current_host_data = ConfigurableDataParser._extract_data(host_node, host_fields)
-
-                item_data = ConfigurableDataParser._extract_data(report_item, item_fields)
-                
-                # 使用 yield 產出一筆合併後的完整資料
-                yield {**current_host_data, **item_data}
+                yield item_index, host_node, report_item
+                item_index += 1
             
             finally:
                 # 記憶體清理是必須的，無論是否發生錯誤
@@ -71,20 +117,57 @@ class ConfigurableDataParser:
         del context
 
     @staticmethod
-    def parse_file(file_path: Path, fields_config: List[FieldConfig]) -> pd.DataFrame:
+    def _iter_rows_from_stream(stream, host_fields: List[FieldConfig], item_fields: List[FieldConfig], with_index: bool = False, with_scan_time: bool = False) -> Iterator[Dict[str, Any]]:
+        """私有的生成器：從一個已開啟的二進位串流中逐筆解析資料。"""
+        current_host_ip: str | None = None
+        current_host_data: Dict[str, Any] = {}
+
+        for item_index, host_node, report_item in ConfigurableDataParser._iter_report_items(stream):
+            ip = host_node.get('name')
+
+            if ip != current_host_ip:
+                current_host_ip = ip
+                current_host_data = ConfigurableDataParser._extract_data(host_node, host_fields)
+                if with_scan_time:
+                    current_host_data[SCAN_TIME_COLUMN] = ConfigurableDataParser._extract_scan_time(host_node)
+
+            item_data = ConfigurableDataParser._extract_data(report_item, item_fields)
+            if with_index:
+                item_data[ITEM_INDEX_COLUMN] = item_index
+            
+            # 使用 yield 產出一筆合併後的完整資料
+            yield {**current_host_data, **item_data}
+
+    @staticmethod
+    def parse_file(file_path: Union[Path, NessusSource], fields_config: List[FieldConfig], lazy: bool = False, with_scan_time: bool = False, on_read: Optional[Callable[[int], None]] = None) -> pd.DataFrame:
         """
-        解析單一的 .nessus XML 檔案。
+        解析單一的 .nessus XML 檔案（或壓縮檔中的 .nessus 資料來源）。
         此版本透過呼叫一個生成器來獲取資料流，並直接交給 pandas 處理。
+
+        當 `lazy` 為 True 時，被標記為 `lazy: true` 的大型文字欄位不會被讀入，
+        取而代之的是記錄資料來源與 ReportItem 序號的兩個內部欄位，
+        實際文字會在寫出報告時由 `LazyTextResolver` 依序回讀。
+
+        當 `with_scan_time` 為 True 時，會額外附帶 `SCAN_TIME_COLUMN` 內部欄位
+        （取自各主機的 HOST_START 等標籤），供弱點資料庫記錄實際的掃描時間。
+
+        `on_read` 會在解析過程中以每次從磁碟讀取的位元組數被呼叫（詳見 `NessusSource.open`）。
         """
-        if not file_path.is_file():
-            raise ParsingError(f"檔案不存在: {file_path}")
+        source = NessusSource.coerce(file_path)
+        if not source.exists():
+            raise ParsingError(f"檔案不存在: {source}")
 
         host_fields = [f for f in fields_config if f['source_tag'] == 'ReportHost']
         item_fields = [f for f in fields_config if f['source_tag'] == 'ReportItem']
+        lazy = lazy and any(is_lazy_field(f) for f in item_fields)
+        if lazy:
+            item_fields = [f for f in item_fields if not is_lazy_field(f)]
         
         try:
             # 獲取資料流（生成器）
-            row_iterator = ConfigurableDataParser._iter_parsed_rows(file_path, host_fields, item_fields)
+            row_iterator = ConfigurableDataParser._iter_parsed_rows(
+                source, host_fields, item_fields, with_index=lazy, with_scan_time=with_scan_time, on_read=on_read
+            )
 
             # --- 直接從迭代器建立 DataFrame ---
             # 這種方式比先建立一個巨大的 list 更節省記憶體
@@ -98,10 +181,102 @@ class ConfigurableDataParser:
             ordered_columns = [field['displayName'] for field in fields_config]
             # 過濾掉那些可能不存在於 df 中的欄位（例如，檔案中完全沒有出現的 optional 欄位）
             final_ordered_columns = [col for col in ordered_columns if col in df.columns]
+
+            if lazy:
+                # 資料來源以 Categorical 儲存，每列只佔一個整數代碼
+                df[SOURCE_REF_COLUMN] = pd.Categorical.from_codes([0] * len(df), categories=pd.Index([source], dtype=object))
+                final_ordered_columns += LAZY_REF_COLUMNS
+            if with_scan_time:
+                final_ordered_columns.append(SCAN_TIME_COLUMN)
             
             return df[final_ordered_columns]
 
         except etree.XMLSyntaxError as e:
-            raise ParsingError(f"XML 語法錯誤於檔案 {file_path}: {e}") from e
+            raise ParsingError(f"XML 語法錯誤於檔案 {source}: {e}") from e
         except Exception as e:
-            raise ParsingError(f"解析檔案 {file_path} 時發生未預期的錯誤: {e}") from e
+            raise ParsingError(f"解析檔案 {source} 時發生未預期的錯誤: {e}") from e
+
+class LazyTextResolver:
+    """
+    在寫出報告時，為 lazy 模式的 DataFrame 補回大型文字欄位。
+    它為每個資料來源保留一個只會往前推進的讀取游標，因此依檔案順序
+    分批寫出時，每個來源檔案只會被完整地循序讀取一次。
+    資料若已被重新排序（例如外部排序的結果），各批次會混有所有來源的資料列，
+    游標將不斷倒回重讀，因此排序前應先逐檔呼叫 `materialize`。
+    """
+    # 同時保持開啟的資料來源游標上限，超過時關閉最久未使用者
+    MAX_OPEN_CURSORS = 16
+
+    def __init__(self, fields_config: List[FieldConfig]):
+        self._fields = fields_config
+        self._lazy_fields = [f for f in fields_config if is_lazy_field(f)]
+        self._cursors: 'OrderedDict[NessusSource, Tuple[Iterator[Tuple[int, Dict[str, Any]]], int, Optional[Dict[str, Any]]]]' = OrderedDict()
+
+    def __enter__(self) -> 'LazyTextResolver':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @staticmethod
+    def is_lazy_frame(df: pd.DataFrame) -> bool:
+        """判斷一個 DataFrame 是否含有 lazy 模式的參照欄位。"""
+        return all(col in df.columns for col in LAZY_REF_COLUMNS)
+
+    def _fetch(self, source: NessusSource, item_index: int) -> Dict[str, Any]:
+        """私有方法：從來源的游標取回指定序號的資料；若序號在游標之前，則重新開啟來源。"""
+        cursor = self._cursors.pop(source, None)
+        if cursor is None or item_index < cursor[1]:
+            if cursor is not None:
+                cursor[0].close()
+            cursor = (ConfigurableDataParser.iter_item_values(source, self._lazy_fields), -1, None)
+
+        iterator, position, values = cursor
+        while position < item_index:
+            position, values = next(iterator)
+
+        self._cursors[source] = (iterator, position, values)
+        while len(self._cursors) > self.MAX_OPEN_CURSORS:
+            _, (stale_iterator, _, _) = self._cursors.popitem(last=False)
+            stale_iterator.close()
+        return values or {}
+
+    def materialize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        回傳一個補齊 lazy 欄位、並移除內部參照欄位的 DataFrame。
+        不含參照欄位的 DataFrame 會被原樣回傳。
+
+        Raises:
+            ParsingError: 如果回讀資料來源失敗。
+        """
+        if not self.is_lazy_frame(df):
+            return df
+
+        lazy_columns: Dict[str, List[Any]] = {f['displayName']: [None] * len(df) for f in self._lazy_fields}
+        refs = list(zip(df[SOURCE_REF_COLUMN], df[ITEM_INDEX_COLUMN]))
+
+        # 依 (來源, 序號) 排序後再讀取，讓每個來源都能循序前進
+        order = sorted(range(len(refs)), key=lambda i: (str(refs[i][0]), refs[i][1]))
+        try:
+            for row in order:
+                source, item_index = refs[row]
+                values = self._fetch(source, int(item_index))
+                for name in lazy_columns:
+                    lazy_columns[name][row] = values.get(name)
+        except StopIteration:
+            raise ParsingError(f"回讀檔案 {refs[row][0]} 時找不到第 {refs[row][1]} 筆資料，檔案可能已被修改。")
+        except etree.XMLSyntaxError as e:
+            raise ParsingError(f"回讀檔案 {refs[row][0]} 時發生 XML 語法錯誤: {e}") from e
+
+        result = df.drop(columns=LAZY_REF_COLUMNS)
+        for name, values in lazy_columns.items():
+            result[name] = values
+
+        ordered_columns = [f['displayName'] for f in self._fields if f['displayName'] in result.columns]
+        return result[ordered_columns + [c for c in result.columns if c not in ordered_columns]]
+
+    def close(self) -> None:
+        """關閉所有仍開啟的資料來源。"""
+        for iterator, _, _ in self._cursors.values():
+            iterator.close()
+        self._cursors.clear()
@@ -1,17 +1,145 @@
 # src/nessus_reporter/core/processor.py
 
 import pandas as pd
+import itertools
 import logging
+import time
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Callable, Any
+from typing import List, Dict, Optional, Callable, Any, Iterable, Iterator, Tuple, Union
 
 # 導入我們需要的兄弟模組和型別
 from .config_manager import FieldConfig
-from .parser import ConfigurableDataParser, ParsingError
+from .parser import ConfigurableDataParser, LazyTextResolver, ParsingError, SCAN_TIME_COLUMN
+from .store import FindingsStore, StoreError
+from .sources import NessusSource, DiscoveryOptions, discover_sources
+from .incremental import IncrementalError, IncrementalUpdateResult, ProcessedManifest, PartitionWriter
+from .generator import ReportGenerationError
+
+@dataclass
+class ProgressInfo:
+    """
+    批次處理的進度快照。進度以位元組計算，避免單一超大檔案讓以檔案數計算的進度失真；
+    預估剩餘時間 (ETA) 則依目前的處理吞吐量推算。
+    """
+    files_done: int
+    files_total: int
+    bytes_done: int
+    bytes_total: int
+    rows_done: int
+    elapsed_seconds: float
+    source: Optional[NessusSource] = None  # 最近一個處理完成的資料來源
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_done / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_done / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """預估剩餘秒數；尚未有任何吞吐量資料時回傳 None。"""
+        if self.bytes_per_second <= 0:
+            return None
+        return max(self.bytes_total - self.bytes_done, 0) / self.bytes_per_second
 
 # 定義回呼函式的型別簽名，以增強可讀性
-ProgressCallback = Callable[[int, int, Path], None]
+ProgressCallback = Callable[[ProgressInfo], None]
+UpdateCallback = Callable[[IncrementalUpdateResult], None]
+
+class _ProgressTracker:
+    """私有輔助類別：累計已處理的檔案數、位元組與資料列數，並透過回呼回報進度。"""
+    # 解析單一檔案期間，兩次進度回報之間的最短間隔（秒）
+    REPORT_INTERVAL = 0.5
+
+    def __init__(self, sizes: List[int], callback: Optional[ProgressCallback]):
+        self._callback = callback
+        self._started = time.monotonic()
+        self._last_report = self._started
+        self._bytes_finished = 0
+        self.info = ProgressInfo(0, len(sizes), 0, sum(sizes), 0, 0.0)
+
+    def report(self) -> None:
+        if self._callback:
+            self._last_report = time.monotonic()
+            self.info.elapsed_seconds = self._last_report - self._started
+            self._callback(self.info)
+
+    def reader(self, size: int) -> Callable[[int], None]:
+        """
+        回傳一個供 `NessusSource.open` 使用的讀取回呼，在解析大小為 `size` 的檔案期間
+        依已讀取的位元組數推進進度（不超過檔案大小），並以 `REPORT_INTERVAL` 節流回報。
+        """
+        read = 0
+
+        def on_read(count: int) -> None:
+            nonlocal read
+            read = min(read + count, size)
+            self.info.bytes_done = self._bytes_finished + read
+            if time.monotonic() - self._last_report >= self.REPORT_INTERVAL:
+                self.report()
+
+        return on_read
+
+    def advance(self, source: NessusSource, size: int, rows: int) -> None:
+        self.info.files_done += 1
+        self._bytes_finished += size
+        self.info.bytes_done = self._bytes_finished
+        self.info.rows_done += rows
+        self.info.source = source
+        self.report()
+
+def _sized_sources(
+    sources: List[NessusSource],
+    on_error: Callable[[NessusSource, Exception], None]
+) -> List[Tuple[int, NessusSource]]:
+    """
+    私有輔助函式：取得每個資料來源的大小。
+    搜尋後才被移除或損毀的來源會交給 `on_error` 處理並被略過，而不會中斷整批處理。
+    """
+    sized: List[Tuple[int, NessusSource]] = []
+    for source in sources:
+        try:
+            sized.append((source.size, source))
+        except (OSError, zipfile.BadZipFile, KeyError) as e:
+            on_error(source, e)
+    return sized
+
+def _parse_source(
+    source: NessusSource,
+    fields_config: List[FieldConfig],
+    lazy: bool,
+    with_scan_time: bool = False,
+    on_read: Optional[Callable[[int], None]] = None
+) -> pd.DataFrame:
+    """在工作行程中解析單一資料來源（需為模組層級函式，才能被 ProcessPoolExecutor 序列化）。"""
+    return ConfigurableDataParser.parse_file(source, fields_config, lazy=lazy, with_scan_time=with_scan_time, on_read=on_read)
+
+def _ingest_into(
+    sink: FindingsStore,
+    source: NessusSource,
+    parsed_df: pd.DataFrame,
+    fields_config: List[FieldConfig],
+    errors: List[Dict[str, Any]]
+) -> pd.DataFrame:
+    """
+    私有輔助函式：將一個來源的解析結果寫入弱點資料庫，並回傳移除內部掃描時間欄位後的 DataFrame。
+    寫入資料庫失敗不影響本次報告，僅記錄到 `errors` 中。
+    """
+    try:
+        # 資料庫需要完整的文字，因此 lazy 欄位在寫入前先逐檔讀回
+        with LazyTextResolver(fields_config) as resolver:
+            sink.ingest(source, resolver.materialize(parsed_df))
+    except (StoreError, ParsingError) as e:
+        errors.append({"file": str(source), "error": str(e)})
+        logging.warning(f"無法寫入弱點資料庫: {source.name} | 原因: {e}")
+    return parsed_df.drop(columns=[SCAN_TIME_COLUMN], errors='ignore')
 
 # [優化] 使用 Dataclass 來封裝回傳結果，使其更具可讀性和擴充性
 @dataclass
@@ -23,64 +151,408 @@ class BatchProcessingResult:
 class BatchProcessor:
     """
     負責處理整個資料夾的批次任務。
-    它會遍歷資料夾中的所有 .nessus 檔案，調用解析器，
+    它會遍歷資料夾中的所有 .nessus 檔案（包含壓縮檔），調用解析器，
     並將所有結果合併成一個單一的 DataFrame。
     """
 
     @staticmethod
-    def process_folder(
+    def iter_folder(
         folder_path: Path, 
         fields_config: List[FieldConfig],
-        progress_callback: Optional[ProgressCallback] = None
-    ) -> BatchProcessingResult:
+        errors: List[Dict[str, Any]],
+        progress_callback: Optional[ProgressCallback] = None,
+        sink: Optional[FindingsStore] = None,
+        lazy: bool = False,
+        discovery: Optional[DiscoveryOptions] = None,
+        max_workers: int = 1,
+        preserve_order: bool = False
+    ) -> Iterator[pd.DataFrame]:
         """
-        處理指定資料夾內的所有 .nessus 檔案。
+        [生成器] 逐一解析資料夾內的 .nessus 檔案，每解析完一個檔案就產出其 DataFrame。
+        與 `process_folder` 不同，它不會把所有結果同時留在記憶體中，
+        適合搭配外部排序等串流式的報告流程。
 
         Args:
             folder_path (Path): 包含 .nessus 檔案的資料夾路徑。
             fields_config (List[FieldConfig]): 從 ConfigurationManager 獲取的欄位設定。
-            progress_callback (Optional[ProgressCallback]): 
-                一個可選的回呼函式，用於回報處理進度。
+            errors (List[Dict[str, Any]]): 處理過程中的錯誤會被附加到這個列表中。
+            progress_callback, sink, lazy, discovery, max_workers: 與 `process_folder` 相同。
+            preserve_order (bool): 平行處理時是否仍依搜尋順序產出（詳見 `iter_sources`）。
 
-        Returns:
-            BatchProcessingResult: 一個包含 dataframe 和 errors 兩個屬性的結果物件。
+        Yields:
+            pd.DataFrame: 每個檔案解析出的非空 DataFrame。
         """
         if not folder_path.is_dir():
-            error = {"file": str(folder_path), "error": "提供的路徑不是一個有效的資料夾。"}
-            return BatchProcessingResult(dataframe=pd.DataFrame(), errors=[error])
+            errors.append({"file": str(folder_path), "error": "提供的路徑不是一個有效的資料夾。"})
+            return
 
-        nessus_files = list(folder_path.glob('*.nessus'))
-        total_files = len(nessus_files)
+        nessus_files = discover_sources(folder_path, discovery)
 
-        if total_files == 0:
-            error = {"file": str(folder_path), "error": "資料夾中未找到任何 .nessus 檔案。"}
-            return BatchProcessingResult(dataframe=pd.DataFrame(), errors=[error])
+        if not nessus_files:
+            errors.append({"file": str(folder_path), "error": "資料夾中未找到任何 .nessus 檔案。"})
+            return
 
-        dfs_to_merge: List[pd.DataFrame] = []
-        parsing_errors: List[Dict[str, Any]] = []
+        yield from BatchProcessor.iter_sources(
+            nessus_files, fields_config, errors,
+            progress_callback=progress_callback, sink=sink, lazy=lazy,
+            max_workers=max_workers, preserve_order=preserve_order
+        )
 
-        for i, file_path in enumerate(nessus_files):
-            current_file_num = i + 1
-            
-            if progress_callback:
-                progress_callback(current_file_num, total_files, file_path)
+    @staticmethod
+    def _iter_parse_results(
+        indexed_sources: List[Tuple[int, int, NessusSource]],
+        fields_config: List[FieldConfig],
+        lazy: bool,
+        max_workers: int,
+        with_scan_time: bool = False,
+        tracker: Optional[_ProgressTracker] = None
+    ) -> Iterator[Tuple[int, int, NessusSource, Union[pd.DataFrame, ParsingError]]]:
+        """
+        私有的生成器：解析所有 (序號, 大小, 來源)，產出 (序號, 大小, 來源, DataFrame 或 ParsingError)。
+        單一行程時會依讀取的位元組數透過 `tracker` 回報檔案內的進度；
+        `max_workers` 大於 1 時以多個行程平行解析，並依完成順序產出結果。
 
-            try:
-                parsed_df = ConfigurableDataParser.parse_file(file_path, fields_config)
-                if not parsed_df.empty:
-                    dfs_to_merge.append(parsed_df)
-            
-            except ParsingError as e:
-                error_info = {"file": str(file_path), "error": str(e)}
-                parsing_errors.append(error_info)
+        若工作行程異常終止（例如解析超大檔案時記憶體不足），當時正在處理的來源會被記錄為錯誤，
+        其餘尚未處理的來源則改在目前的行程中依序解析。
+        """
+        def parse_serially(items: Iterable[Tuple[int, int, NessusSource]]) -> Iterator[Tuple[int, int, NessusSource, Union[pd.DataFrame, ParsingError]]]:
+            for index, size, source in items:
+                on_read = tracker.reader(size) if tracker else None
+                try:
+                    yield index, size, source, _parse_source(source, fields_config, lazy, with_scan_time, on_read)
+                except ParsingError as e:
+                    yield index, size, source, e
+
+        if max_workers <= 1:
+            yield from parse_serially(indexed_sources)
+            return
+
+        remaining = iter(indexed_sources)
+        # 行程池損壞時尚未成功提交的來源
+        unsubmitted: List[Tuple[int, int, NessusSource]] = []
+        pool_broken = False
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # 只保留有限數量的進行中工作，已完成的結果交出後即可被釋放；
+            # 工作依提交順序被取用，因此最大的檔案會最先開始處理
+            in_flight: Dict[Future, Tuple[int, int, NessusSource]] = {}
+
+            def submit_next() -> None:
+                nonlocal pool_broken
+                if pool_broken:
+                    return
+                item = next(remaining, None)
+                if item is None:
+                    return
+                try:
+                    in_flight[executor.submit(_parse_source, item[2], fields_config, lazy, with_scan_time)] = item
+                except BrokenProcessPool:
+                    pool_broken = True
+                    unsubmitted.append(item)
+
+            for _ in range(max_workers * 2):
+                submit_next()
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, size, source = in_flight.pop(future)
+                    try:
+                        outcome: Union[pd.DataFrame, ParsingError] = future.result()
+                    except ParsingError as e:
+                        outcome = e
+                    except BrokenProcessPool as e:
+                        pool_broken = True
+                        outcome = ParsingError(f"解析檔案 {source} 時工作行程異常終止（可能是記憶體不足）: {e}")
+                    except Exception as e:
+                        outcome = ParsingError(f"解析檔案 {source} 時發生未預期的錯誤: {e}")
+                    submit_next()
+                    yield index, size, source, outcome
+
+        if pool_broken:
+            logging.warning("平行解析的工作行程異常終止，其餘檔案改為依序解析。")
+            yield from parse_serially(itertools.chain(unsubmitted, remaining))
+
+    @staticmethod
+    def iter_sources(
+        nessus_files: List[NessusSource],
+        fields_config: List[FieldConfig],
+        errors: List[Dict[str, Any]],
+        progress_callback: Optional[ProgressCallback] = None,
+        sink: Optional[FindingsStore] = None,
+        lazy: bool = False,
+        max_workers: int = 1,
+        preserve_order: bool = False
+    ) -> Iterator[pd.DataFrame]:
+        """
+        [生成器] 與 `iter_folder` 相同，但處理的是一份明確指定的資料來源列表
+        （例如分片清單中的某一個分片）。
+
+        平行處理時（`max_workers` > 1）採「最大者優先」排程，避免大型檔案排在最後
+        讓其他工作行程閒置；此時產出的順序預設為完成順序。
+        `preserve_order` 為 True 時，提早完成的結果會被暫存，仍依檔案順序產出。
+        無法取得大小（例如在搜尋後被移除）的來源會記錄到 `errors` 中並被略過。
+        """
+        def record_error(source: NessusSource, error: Exception) -> None:
+            errors.append({"file": str(source), "error": str(error)})
+            logging.warning(f"跳過檔案 (無法讀取): {source.name} | 原因: {error}")
+
+        sized_sources = _sized_sources(nessus_files, record_error)
+        indexed_sources = [(index, size, source) for index, (size, source) in enumerate(sized_sources)]
+        if max_workers > 1:
+            indexed_sources.sort(key=lambda item: item[1], reverse=True)
+
+        tracker = _ProgressTracker([size for size, _ in sized_sources], progress_callback)
+        tracker.report()
+
+        results = BatchProcessor._iter_parse_results(
+            indexed_sources, fields_config, lazy, max_workers,
+            with_scan_time=sink is not None, tracker=tracker
+        )
+        # 依序號暫存尚不能產出的結果（None 表示該來源沒有資料）
+        buffered: Dict[int, Optional[pd.DataFrame]] = {}
+        next_index = 0
+        for index, size, file_path, outcome in results:
+            parsed_df: Optional[pd.DataFrame] = None
+            if isinstance(outcome, ParsingError):
+                errors.append({"file": str(file_path), "error": str(outcome)})
                 # [優化] 引入日誌記錄。使用 warning 等級，因為這是一個被預期且已處理的錯誤。
-                logging.warning(f"跳過檔案 (解析失敗): {file_path.name} | 原因: {e}")
+                logging.warning(f"跳過檔案 (解析失敗): {file_path.name} | 原因: {outcome}")
+                tracker.advance(file_path, size, 0)
+            else:
+                parsed_df = outcome
+                if not parsed_df.empty and sink is not None:
+                    parsed_df = _ingest_into(sink, file_path, parsed_df, fields_config, errors)
+                tracker.advance(file_path, size, len(parsed_df))
+                if parsed_df.empty:
+                    parsed_df = None
+
+            if not preserve_order:
+                if parsed_df is not None:
+                    yield parsed_df
+                continue
+
+            buffered[index] = parsed_df
+            while next_index in buffered:
+                ready = buffered.pop(next_index)
+                next_index += 1
+                if ready is not None:
+                    yield ready
+
+    @staticmethod
+    def process_folder(
+        folder_path: Path, 
+        fields_config: List[FieldConfig],
+        progress_callback: Optional[ProgressCallback] = None,
+        sink: Optional[FindingsStore] = None,
+        lazy: bool = False,
+        discovery: Optional[DiscoveryOptions] = None,
+        max_workers: int = 1
+    ) -> BatchProcessingResult:
+        """
+        處理指定資料夾內的所有 .nessus 檔案。
+        `.nessus.gz/.bz2/.xz` 與 zip 壓縮檔中的 .nessus 成員會被直接串流解析。
+
+        Args:
+            folder_path (Path): 包含 .nessus 檔案的資料夾路徑。
+            fields_config (List[FieldConfig]): 從 ConfigurationManager 獲取的欄位設定。
+            progress_callback (Optional[ProgressCallback]): 
+                一個可選的回呼函式，每處理完一個檔案就以 `ProgressInfo` 回報一次進度
+                （已處理的檔案數、位元組、資料列數與預估剩餘時間）。
+            sink (Optional[FindingsStore]):
+                一個可選的弱點資料庫，每個檔案解析完成後，其資料會被增量寫入。
+            lazy (bool):
+                是否以 lazy 模式解析大型文字欄位（詳見 `ConfigurableDataParser.parse_file`）。
+            discovery (Optional[DiscoveryOptions]):
+                搜尋資料來源的選項（是否遞迴搜尋子資料夾、include / exclude 樣式）。
+            max_workers (int):
+                平行解析的工作行程數；大於 1 時採最大檔案優先排程，
+                合併結果仍依檔案的搜尋順序排列。
+
+        Returns:
+            BatchProcessingResult: 一個包含 dataframe 和 errors 兩個屬性的結果物件。
+        """
+        parsing_errors: List[Dict[str, Any]] = []
+        dfs_to_merge = list(BatchProcessor.iter_folder(
+            folder_path, fields_config, parsing_errors,
+            progress_callback=progress_callback, sink=sink, lazy=lazy,
+            discovery=discovery, max_workers=max_workers, preserve_order=True
+        ))
         
         if not dfs_to_merge:
             return BatchProcessingResult(dataframe=pd.DataFrame(), errors=parsing_errors)
 
         # 理論上的效能瓶頸：如果所有 df 都很大，這裡會佔用較多記憶體。
-        # 但對於絕大多數情況，這是最高效的作法。
+        # 需要控制記憶體用量時，請改用 `iter_folder` 搭配串流式的報告流程。
         final_df = pd.concat(dfs_to_merge, ignore_index=True)
         
         return BatchProcessingResult(dataframe=final_df, errors=parsing_errors)
+
+    @staticmethod
+    def refresh_folder(
+        folder_path: Path,
+        fields_config: List[FieldConfig],
+        output_dir: Path,
+        output_format: str = 'csv',
+        selected_columns: Optional[List[str]] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        sink: Optional[FindingsStore] = None,
+        settle_seconds: float = 0.0,
+        discovery: Optional[DiscoveryOptions] = None
+    ) -> IncrementalUpdateResult:
+        """
+        增量更新輸出目錄：只解析自上次更新後新增或變動的檔案。
+
+        每個資料來源對應輸出目錄中的一個分區檔（csv / xlsx）：
+        新檔案會新增分區、變動的檔案只重寫其自身的分區、被移除的檔案則刪除其分區。
+        已處理的檔案記錄在輸出目錄的 `processed_manifest.json` 中；
+        若輸出格式或欄位與清單中記錄的不同，所有分區都會以新的設定重新產生。
+
+        單一檔案的失敗（解析失敗、檔案在搜尋後被移除、分區檔被其他程式鎖定等）
+        只會記錄到結果的 errors 中，該檔案會在下次更新時重試。
+
+        Args:
+            folder_path (Path): 包含 .nessus 檔案的資料夾路徑。
+            fields_config (List[FieldConfig]): 從 ConfigurationManager 獲取的欄位設定。
+            output_dir (Path): 分區檔與處理清單的輸出目錄。
+            output_format (str): 分區檔格式，'csv' 或 'xlsx'。
+            selected_columns (Optional[List[str]]): 要輸出的欄位，預設為所有欄位。
+            progress_callback (Optional[ProgressCallback]): 只針對需要處理的檔案回報進度。
+            sink (Optional[FindingsStore]): 一個可選的弱點資料庫。
+            settle_seconds (float): 修改時間距今少於此秒數的檔案視為仍在寫入中，留待下次處理。
+            discovery (Optional[DiscoveryOptions]): 搜尋資料來源的選項。
+
+        Returns:
+            IncrementalUpdateResult: 本次新增、更新、移除的來源與錯誤。
+        """
+        result = IncrementalUpdateResult()
+        if not folder_path.is_dir():
+            result.errors.append({"file": str(folder_path), "error": "提供的路徑不是一個有效的資料夾。"})
+            return result
+
+        manifest = ProcessedManifest.load(output_dir)
+        selected_columns = selected_columns or [f['displayName'] for f in fields_config]
+        writer = PartitionWriter(output_dir, output_format, selected_columns)
+        output_changed = not manifest.matches_output(output_format, selected_columns)
+        if output_changed and manifest.entries:
+            logging.info("輸出格式或欄位已變更，將重新產生所有分區。")
+
+        def record_error(source: NessusSource, error: Exception) -> None:
+            # 不更新清單中的紀錄，下次更新時會重試（檔案可能仍在寫入中或被鎖定）
+            result.errors.append({"file": str(source), "error": str(error)})
+            logging.warning(f"跳過檔案: {source.name} | 原因: {error}")
+            manifest.invalidate(str(source))
+
+        unreadable_archives: List[Path] = []
+
+        def record_unreadable_archive(path: Path, error: Exception) -> None:
+            # 壓縮檔可能仍在複製或改寫中；其成員的分區保留到能讀取時再比對，而不是視為已移除
+            result.errors.append({"file": str(path), "error": f"無法讀取壓縮檔，將於下次更新時重試: {error}"})
+            logging.warning(f"跳過壓縮檔: {path.name} | 原因: {error}")
+            unreadable_archives.append(path)
+
+        sources = discover_sources(folder_path, discovery, on_error=record_unreadable_archive)
+        current_keys = {str(source) for source in sources}
+        unreadable_prefixes = tuple(f"{path}!" for path in unreadable_archives)
+        now = time.time()
+        pending: List[NessusSource] = []
+        for source in sources:
+            try:
+                if manifest.is_current(source):
+                    # 已處理且未變動的來源，只有在輸出設定變更時才需要重新產生
+                    if output_changed:
+                        pending.append(source)
+                elif now - source.path.stat().st_mtime >= settle_seconds:
+                    pending.append(source)
+            except (OSError, zipfile.BadZipFile, KeyError) as e:
+                record_error(source, e)
+
+        try:
+            # 1. 來源已被移除者，刪除其分區
+            removed_keys = [
+                key for key in manifest.entries
+                if key not in current_keys and not key.startswith(unreadable_prefixes)
+            ]
+            for key in removed_keys:
+                partition = manifest.entries.pop(key).get('partition')
+                if partition:
+                    writer.remove(partition)
+                result.removed.append(key)
+
+            # 2. 只解析新增或變動的來源
+            sized_sources = _sized_sources(pending, record_error)
+            tracker = _ProgressTracker([size for size, _ in sized_sources], progress_callback)
+            tracker.report()
+            for size, source in sized_sources:
+                previous = manifest.entries.get(str(source))
+                try:
+                    parsed_df = ConfigurableDataParser.parse_file(
+                        source, fields_config, with_scan_time=sink is not None, on_read=tracker.reader(size)
+                    )
+
+                    partition: Optional[Path] = None
+                    if not parsed_df.empty:
+                        if sink is not None:
+                            parsed_df = _ingest_into(sink, source, parsed_df, fields_config, result.errors)
+                        partition = writer.write(source, parsed_df)
+
+                    manifest.record(source, partition, len(parsed_df))
+                except (ParsingError, IncrementalError, ReportGenerationError, OSError, zipfile.BadZipFile, KeyError) as e:
+                    record_error(source, e)
+                    tracker.advance(source, size, 0)
+                    continue
+
+                # 舊的分區（例如格式變更前的檔案，或檔案已無資料時）不再使用，將其刪除
+                old_partition = previous.get('partition') if previous else None
+                if old_partition and old_partition != manifest.entries[str(source)]['partition']:
+                    writer.remove(old_partition)
+
+                result.rows_written += len(parsed_df)
+                (result.updated if previous else result.added).append(str(source))
+                tracker.advance(source, size, len(parsed_df))
+        finally:
+            manifest.set_output(output_format, selected_columns)
+            if result.has_changes or result.errors or output_changed:
+                manifest.save()
+
+        return result
+
+    @staticmethod
+    def watch_folder(
+        folder_path: Path,
+        fields_config: List[FieldConfig],
+        output_dir: Path,
+        output_format: str = 'csv',
+        selected_columns: Optional[List[str]] = None,
+        interval: float = 30.0,
+        settle_seconds: float = 5.0,
+        stop_event: Optional[threading.Event] = None,
+        on_update: Optional[UpdateCallback] = None,
+        sink: Optional[FindingsStore] = None,
+        discovery: Optional[DiscoveryOptions] = None
+    ) -> None:
+        """
+        監看模式：每隔 `interval` 秒呼叫一次 `refresh_folder`，持續增量更新輸出目錄，
+        直到 `stop_event` 被設定為止。每次有變動時會呼叫 `on_update`。
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                result = BatchProcessor.refresh_folder(
+                    folder_path, fields_config, output_dir, output_format, selected_columns,
+                    sink=sink, settle_seconds=settle_seconds, discovery=discovery
+                )
+            except Exception as e:
+                # 監看模式需長時間運作，單次更新失敗（例如資料夾暫時無法存取）不應結束監看
+                logging.error(f"增量更新失敗，將於下次檢查時重試: {e}", exc_info=True)
+                stop_event.wait(interval)
+                continue
+
+            if result.has_changes or result.errors:
+                logging.info(
+                    f"增量更新: 新增 {len(result.added)}、更新 {len(result.updated)}、"
+                    f"移除 {len(result.removed)} 個檔案，寫入 {result.rows_written} 筆資料。"
+                )
+                if on_update:
+                    on_update(result)
+            stop_event.wait(interval)
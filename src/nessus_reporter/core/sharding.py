@@ -0,0 +1,267 @@
+# src/nessus_reporter/core/sharding.py
+
+import hashlib
+import heapq
+import json
+import logging
+import os
+import sqlite3
+import pandas as pd
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterator
+
+from .config_manager import FieldConfig
+from .processor import BatchProcessor, ProgressCallback, _sized_sources
+from .sources import NessusSource, DiscoveryOptions, discover_sources
+from .sorter import ExternalSorter, SortKey
+from .generator import ExcelReportGenerator
+from .html_generator import report_generator_for
+
+class ShardError(Exception):
+    """當分片清單、分片執行或合併過程發生錯誤時引發的基礎類別。"""
+    pass
+
+class ShardPlanner:
+    """
+    負責大規模批次處理的分片流程：
+      1. `create_manifest`：依檔案大小將資料夾切分為數個負載平衡的分片，寫成清單檔。
+      2. `run_shard`：每個節點（或行程）處理清單中的一個分片，輸出一個部分結果檔。
+      3. `merge_partials`：在所有分片完成後，合併部分結果並生成最終報告。
+
+    各節點只需共用清單檔與部分結果的目錄（例如網路磁碟）即可協同運作。
+    清單中的檔案路徑相對於清單記錄的資料夾，各節點可用 `folder` 參數指定該資料夾在本機的掛載位置。
+    部分結果以 SQLite 檔儲存（不像 pickle 在讀取時可能執行任意程式碼），
+    並記錄所屬清單的識別碼，合併時會拒絕來自其他清單的舊部分結果。
+    """
+    MANIFEST_VERSION = 2
+    PARTIAL_SUFFIX = '.partial.sqlite'
+    PARTIAL_TABLE = 'findings'
+
+    @staticmethod
+    def create_manifest(
+        folder_path: Path, shard_count: int, manifest_path: Path,
+        discovery: Optional[DiscoveryOptions] = None
+    ) -> Dict[str, Any]:
+        """
+        將資料夾中的所有資料來源依大小分配到 `shard_count` 個分片，並寫入清單檔。
+        採用「最大者優先、分配給目前總量最小的分片」的貪婪演算法，使各分片的位元組總量接近。
+
+        搜尋後才被移除或無法讀取的來源會被略過並記錄警告，不會中斷整個規劃。
+
+        Raises:
+            ShardError: 如果資料夾無效、沒有任何檔案，或分片數不合法。
+        """
+        if shard_count < 1:
+            raise ShardError("分片數量必須至少為 1。")
+        if not folder_path.is_dir():
+            raise ShardError(f"提供的路徑不是一個有效的資料夾: {folder_path}")
+
+        def skip_source(source: NessusSource, error: Exception) -> None:
+            logging.warning(f"規劃分片時略過檔案 (無法讀取): {source} | 原因: {error}")
+
+        sized_sources = sorted(
+            _sized_sources(discover_sources(folder_path, discovery), skip_source),
+            key=lambda item: item[0], reverse=True
+        )
+        if not sized_sources:
+            raise ShardError(f"資料夾中未找到任何 .nessus 檔案: {folder_path}")
+
+        shards: List[Dict[str, Any]] = [
+            {"index": i, "total_bytes": 0, "sources": []} for i in range(shard_count)
+        ]
+        heap = [(0, i) for i in range(shard_count)]
+        for size, source in sized_sources:
+            total_bytes, index = heapq.heappop(heap)
+            shards[index]["sources"].append({
+                "path": source.path.relative_to(folder_path).as_posix(), "member": source.member, "size": size
+            })
+            shards[index]["total_bytes"] = total_bytes + size
+            heapq.heappush(heap, (total_bytes + size, index))
+
+        manifest = {
+            "version": ShardPlanner.MANIFEST_VERSION,
+            "folder": str(folder_path.resolve()),
+            "created_at": datetime.now().isoformat(timespec='seconds'),
+            "shards": [shard for shard in shards if shard["sources"]],
+        }
+        # 重新編號，略過因檔案數少於分片數而產生的空分片
+        for i, shard in enumerate(manifest["shards"]):
+            shard["index"] = i
+        # 清單內容的雜湊值，用來辨識部分結果屬於哪一份清單
+        manifest["id"] = hashlib.sha256(json.dumps(manifest, sort_keys=True).encode('utf-8')).hexdigest()
+
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        return manifest
+
+    @staticmethod
+    def load_manifest(manifest_path: Path) -> Dict[str, Any]:
+        """讀取並驗證分片清單檔。"""
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            raise ShardError(f"無法讀取分片清單 {manifest_path}: {e}") from e
+
+        if not isinstance(manifest, dict) or manifest.get("version") != ShardPlanner.MANIFEST_VERSION:
+            raise ShardError(f"不支援的分片清單格式（請以 shard-plan 重新產生）: {manifest_path}")
+        return manifest
+
+    @staticmethod
+    def shard_sources(manifest: Dict[str, Any], shard_index: int, folder: Optional[Path] = None) -> List[NessusSource]:
+        """
+        回傳清單中某個分片的資料來源。
+        `folder` 為資料夾在本節點上的路徑；省略時使用清單中記錄的路徑。
+        """
+        shards = manifest["shards"]
+        if not 0 <= shard_index < len(shards):
+            raise ShardError(f"分片編號 {shard_index} 超出範圍 (共 {len(shards)} 個分片)。")
+        base = folder or Path(manifest["folder"])
+        return [
+            NessusSource(base / entry["path"], entry.get("member"))
+            for entry in shards[shard_index]["sources"]
+        ]
+
+    @staticmethod
+    def partial_path(partial_dir: Path, shard_index: int) -> Path:
+        """回傳某個分片的部分結果檔路徑。"""
+        return partial_dir / f"shard_{shard_index:04d}{ShardPlanner.PARTIAL_SUFFIX}"
+
+    @staticmethod
+    def run_shard(
+        manifest_path: Path,
+        shard_index: int,
+        fields_config: List[FieldConfig],
+        partial_dir: Path,
+        progress_callback: Optional[ProgressCallback] = None,
+        folder: Optional[Path] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        處理清單中的一個分片，並將結果寫成部分結果檔。
+        檔案先寫入暫存名稱再改名，因此合併步驟只會看到完整寫完的部分結果。
+
+        Returns:
+            List[Dict[str, Any]]: 此分片處理過程中的錯誤。
+        """
+        manifest = ShardPlanner.load_manifest(manifest_path)
+        sources = ShardPlanner.shard_sources(manifest, shard_index, folder)
+
+        errors: List[Dict[str, Any]] = []
+        partial_dir.mkdir(parents=True, exist_ok=True)
+        target = ShardPlanner.partial_path(partial_dir, shard_index)
+        tmp_target = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        tmp_target.unlink(missing_ok=True)
+
+        # 欄位以設定檔為準並一律存為文字，讓每個檔案的結果欄位一致，讀回時也不會被轉型
+        columns = [f['displayName'] for f in fields_config]
+        row_count = 0
+        try:
+            with closing(sqlite3.connect(str(tmp_target))) as conn:
+                conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+                for df in BatchProcessor.iter_sources(sources, fields_config, errors, progress_callback=progress_callback):
+                    # 逐檔附加寫入，不必把整個分片的結果留在記憶體中
+                    df.reindex(columns=columns).to_sql(
+                        ShardPlanner.PARTIAL_TABLE, conn, if_exists='append', index=False,
+                        dtype={col: 'TEXT' for col in columns}
+                    )
+                    row_count += len(df)
+                conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+                    ("manifest_id", manifest["id"]),
+                    ("shard_index", str(shard_index)),
+                    ("errors", json.dumps(errors, ensure_ascii=False)),
+                ])
+                conn.commit()
+            os.replace(tmp_target, target)
+        except (sqlite3.Error, OSError) as e:
+            tmp_target.unlink(missing_ok=True)
+            raise ShardError(f"無法寫入分片 {shard_index} 的部分結果: {e}") from e
+
+        logging.info(f"分片 {shard_index} 完成: {len(sources)} 個檔案, {row_count} 筆資料。")
+        return errors
+
+    @staticmethod
+    def _open_partial(path: Path) -> sqlite3.Connection:
+        """私有輔助方法：以唯讀模式開啟部分結果檔。"""
+        return sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+
+    @staticmethod
+    def _read_partial_meta(path: Path) -> Optional[Dict[str, str]]:
+        """私有輔助方法：讀取部分結果檔的中繼資料；檔案不存在或無法辨識時回傳 None。"""
+        if not path.is_file():
+            return None
+        try:
+            with closing(ShardPlanner._open_partial(path)) as conn:
+                return dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        except sqlite3.Error:
+            return None
+
+    @staticmethod
+    def _iter_partials(manifest: Dict[str, Any], partial_dir: Path, errors: List[Dict[str, Any]]) -> Iterator[pd.DataFrame]:
+        """私有的生成器：依序逐批讀取各部分結果檔，一次只載入一個批次。"""
+        for shard in manifest["shards"]:
+            path = ShardPlanner.partial_path(partial_dir, shard["index"])
+            with closing(ShardPlanner._open_partial(path)) as conn:
+                meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+                errors.extend(json.loads(meta.get("errors", "[]")))
+                has_rows = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (ShardPlanner.PARTIAL_TABLE,)
+                ).fetchone()
+                if has_rows:
+                    yield from pd.read_sql_query(
+                        f"SELECT * FROM {ShardPlanner.PARTIAL_TABLE} ORDER BY rowid", conn,
+                        chunksize=ExcelReportGenerator.WRITE_BATCH_ROWS
+                    )
+
+    @staticmethod
+    def merge_partials(
+        manifest_path: Path,
+        partial_dir: Path,
+        selected_columns: List[str],
+        output_path: Path,
+        fields_config: List[FieldConfig],
+        sort_keys: Optional[List[SortKey]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        合併所有分片的部分結果並生成最終報告（依 `output_path` 副檔名產生 Excel 或 HTML）。
+        若有設定排序鍵，會透過外部排序合併，記憶體用量與單機流程相同。
+
+        Returns:
+            List[Dict[str, Any]]: 所有分片處理過程中累積的錯誤。
+
+        Raises:
+            ShardError: 如果有分片尚未完成，或部分結果屬於其他（舊的）分片清單。
+        """
+        manifest = ShardPlanner.load_manifest(manifest_path)
+        missing: List[str] = []
+        stale: List[str] = []
+        for shard in manifest["shards"]:
+            meta = ShardPlanner._read_partial_meta(ShardPlanner.partial_path(partial_dir, shard["index"]))
+            if meta is None:
+                missing.append(str(shard["index"]))
+            elif meta.get("manifest_id") != manifest["id"]:
+                stale.append(str(shard["index"]))
+        if missing:
+            raise ShardError(f"以下分片尚未完成，無法合併: {', '.join(missing)}")
+        if stale:
+            raise ShardError(f"以下分片的部分結果屬於其他分片清單，請重新執行: {', '.join(stale)}")
+
+        errors: List[Dict[str, Any]] = []
+        generator = report_generator_for(output_path)
+        if sort_keys:
+            columns = [f['displayName'] for f in fields_config]
+            with ExternalSorter(sort_keys, columns) as sorter:
+                for partial_df in ShardPlanner._iter_partials(manifest, partial_dir, errors):
+                    sorter.add(partial_df)
+                generator.generate_report_from_chunks(
+                    sorter.iter_sorted_chunks(ExcelReportGenerator.WRITE_BATCH_ROWS),
+                    selected_columns, output_path, fields_config
+                )
+        else:
+            generator.generate_report_from_chunks(
+                ShardPlanner._iter_partials(manifest, partial_dir, errors),
+                selected_columns, output_path, fields_config
+            )
+        return errors
@@ -0,0 +1,246 @@
+# src/nessus_reporter/core/sorter.py
+
+import heapq
+import ipaddress
+import pickle
+import tempfile
+import pandas as pd
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, IO
+
+from .config_manager import FieldConfig, InvalidConfigError
+
+@dataclass(frozen=True)
+class SortKey:
+    """
+    報告排序中的一個排序鍵。
+    `rank` 為選用的值對應表，用來讓經過 mapping 轉換的欄位（例如風險等級的
+    'Critical'、'High'）依原始數值排序，而不是依字母順序。
+    """
+    display_name: str
+    ascending: bool = True
+    rank: Dict[str, str] = field(default_factory=dict, compare=False, hash=False)
+
+    @staticmethod
+    def from_config(sort_by: Any, fields_config: List[FieldConfig]) -> List['SortKey']:
+        """
+        將設定檔中 `settings.sort_by` 的內容轉換為排序鍵列表。
+
+        每個項目可以是一個 field id 字串（遞增排序），或是
+        `{field: <id>, ascending: <bool>}` 形式的字典。
+
+        Raises:
+            InvalidConfigError: 如果格式錯誤或引用了不存在的 field id。
+        """
+        if not sort_by:
+            return []
+        if not isinstance(sort_by, list):
+            raise InvalidConfigError("'sort_by' 必須是一個列表。")
+
+        fields_by_id = {f['id']: f for f in fields_config}
+        keys: List[SortKey] = []
+        for entry in sort_by:
+            if isinstance(entry, str):
+                entry = {'field': entry}
+            if not isinstance(entry, dict) or 'field' not in entry:
+                raise InvalidConfigError(f"'sort_by' 項目格式錯誤: {entry}")
+
+            field_config = fields_by_id.get(entry['field'])
+            if field_config is None:
+                raise InvalidConfigError(f"'sort_by' 引用了不存在的欄位 ID: '{entry['field']}'")
+
+            # 將 mapping 反轉，讓轉換後的文字能對應回原始值來排序
+            rank = {str(v): str(k) for k, v in field_config.get('mapping', {}).items()}
+            keys.append(SortKey(field_config['displayName'], bool(entry.get('ascending', True)), rank))
+        return keys
+
+class _Descending:
+    """私有輔助類別：反轉比較結果，用於遞減排序無法取負值的鍵。"""
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __lt__(self, other: '_Descending') -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.value == other.value
+
+class ExternalSorter:
+    """
+    一個外部（out-of-core）排序器。
+    加入的資料會先累積在記憶體中，滿 `run_rows` 列後依設定的排序鍵排序，
+    並以「已排序的段落 (run)」寫入暫存檔；最後以 k-way merge 逐批產出排序結果。
+    段落數超過 `merge_fan_in` 時會先分多輪合併，因此同時開啟的暫存檔數有上限；
+    暫存檔中的區塊依估計大小 (`block_bytes`) 切分，合併時每個段落只在記憶體中保留一個區塊。
+    任何時刻在記憶體中的資料量約為 `run_rows` 列加上 `merge_fan_in` × `block_bytes`，
+    而不是總資料量或檔案數。
+    """
+    # 單一排序段落的最大資料列數
+    RUN_ROWS = 50000
+    # 單一輪合併最多同時開啟的段落數
+    MERGE_FAN_IN = 64
+    # 暫存檔中每個序列化區塊的估計大小上限（位元組）
+    BLOCK_BYTES = 256 * 1024
+
+    def __init__(
+        self,
+        sort_keys: List[SortKey],
+        columns: List[str],
+        run_rows: int = RUN_ROWS,
+        spill_dir: Optional[Path] = None,
+        merge_fan_in: int = MERGE_FAN_IN,
+        block_bytes: int = BLOCK_BYTES
+    ):
+        """
+        Args:
+            sort_keys (List[SortKey]): 排序鍵，依優先順序排列。
+            columns (List[str]): 輸出的欄位列表；每批加入的資料都會被對齊到這些欄位。
+            run_rows (int): 單一排序段落的最大資料列數。
+            spill_dir (Optional[Path]): 暫存檔所在目錄，預設為系統暫存目錄。
+            merge_fan_in (int): 單一輪合併最多同時開啟的段落數（至少為 2）。
+            block_bytes (int): 暫存檔中每個區塊的估計大小上限。
+        """
+        self.sort_keys = sort_keys
+        self.columns = columns
+        self.run_rows = run_rows
+        self.merge_fan_in = max(merge_fan_in, 2)
+        self.block_bytes = block_bytes
+        self._tmp_dir = tempfile.TemporaryDirectory(prefix='nessus_sort_', dir=spill_dir)
+        self._runs: List[Path] = []
+        self._run_counter = 0
+        self._buffer: List[Tuple] = []
+        self._key_positions = [
+            (columns.index(k.display_name), k) for k in sort_keys if k.display_name in columns
+        ]
+
+    def __enter__(self) -> 'ExternalSorter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @staticmethod
+    def _value_key(value: Any, sort_key: SortKey) -> Tuple:
+        """
+        私有輔助方法：將單一值轉換為可比較的鍵。
+        空值永遠排在最後；數字、IP 位址與一般文字分群比較，避免型別混用時無法比較。
+        """
+        if value is None or (isinstance(value, float) and pd.isna(value)):
+            return (1,)
+
+        text = sort_key.rank.get(str(value), str(value))
+        try:
+            group, comparable = 0, float(text)
+        except ValueError:
+            try:
+                group, comparable = 1, int(ipaddress.ip_address(text))
+            except ValueError:
+                group, comparable = 2, text
+
+        if not sort_key.ascending:
+            comparable = -comparable if group < 2 else _Descending(comparable)
+        return (0, group, comparable)
+
+    def _row_key(self, row: Tuple) -> Tuple:
+        return tuple(self._value_key(row[pos], k) for pos, k in self._key_positions)
+
+    def add(self, df: pd.DataFrame) -> None:
+        """
+        加入一批資料（例如一個檔案解析出的 DataFrame）。
+        資料會跨批次累積，每滿 `run_rows` 列才排序並寫出一個段落，
+        因此大量的小批次不會產生同樣多的暫存檔。
+        """
+        self._buffer.extend(df.reindex(columns=self.columns).itertuples(index=False, name=None))
+        while len(self._buffer) >= self.run_rows:
+            rows = self._buffer[:self.run_rows]
+            del self._buffer[:self.run_rows]
+            self._spill(rows)
+
+    def _spill(self, rows: List[Tuple]) -> None:
+        """私有方法：排序一個段落並寫入暫存檔。"""
+        rows.sort(key=self._row_key)
+        self._runs.append(self._write_run(rows))
+
+    @staticmethod
+    def _row_bytes(row: Tuple) -> int:
+        """私有輔助方法：粗估一列資料在記憶體中的大小（每個值的物件成本加上文字長度）。"""
+        return 64 * len(row) + sum(len(value) for value in row if isinstance(value, str))
+
+    def _write_run(self, rows: Iterable[Tuple]) -> Path:
+        """私有方法：將已排序的資料列依估計大小切成區塊，序列化到一個新的暫存檔。"""
+        run_path = Path(self._tmp_dir.name) / f"run_{self._run_counter:06d}.pkl"
+        self._run_counter += 1
+        with open(run_path, 'wb') as f:
+            block: List[Tuple] = []
+            block_bytes = 0
+            for row in rows:
+                block.append(row)
+                block_bytes += self._row_bytes(row)
+                if block_bytes >= self.block_bytes:
+                    pickle.dump(block, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    block, block_bytes = [], 0
+            if block:
+                pickle.dump(block, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return run_path
+
+    @staticmethod
+    def _iter_run(f: IO[bytes]) -> Iterator[Tuple]:
+        """私有的生成器：逐區塊讀回一個段落中的資料列。"""
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                return
+            yield from block
+
+    def _iter_merged(self, run_paths: List[Path]) -> Iterator[Tuple]:
+        """私有的生成器：以 k-way merge 合併多個段落，產出排序後的資料列。"""
+        files: List[IO[bytes]] = []
+        try:
+            for run_path in run_paths:
+                files.append(open(run_path, 'rb'))
+            yield from heapq.merge(*(self._iter_run(f) for f in files), key=self._row_key)
+        finally:
+            for f in files:
+                f.close()
+
+    def _reduce_runs(self) -> None:
+        """私有方法：分輪合併段落，直到段落數不超過 `merge_fan_in`。"""
+        while len(self._runs) > self.merge_fan_in:
+            reduced: List[Path] = []
+            for start in range(0, len(self._runs), self.merge_fan_in):
+                group = self._runs[start:start + self.merge_fan_in]
+                if len(group) == 1:
+                    reduced.append(group[0])
+                    continue
+                reduced.append(self._write_run(self._iter_merged(group)))
+                for run_path in group:
+                    run_path.unlink()
+            self._runs = reduced
+
+    def iter_sorted_chunks(self, chunk_rows: int = 5000) -> Iterator[pd.DataFrame]:
+        """
+        [生成器] 合併所有段落，並逐批產出已排序的 DataFrame。
+        """
+        if self._buffer:
+            rows, self._buffer = self._buffer, []
+            self._spill(rows)
+        self._reduce_runs()
+
+        chunk: List[Tuple] = []
+        for row in self._iter_merged(self._runs):
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield pd.DataFrame(chunk, columns=self.columns)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=self.columns)
+
+    def close(self) -> None:
+        """刪除所有暫存檔。"""
+        self._tmp_dir.cleanup()
+        self._runs.clear()
+        self._buffer.clear()
@@ -0,0 +1,245 @@
+# src/nessus_reporter/core/sources.py
+
+import bz2
+import gzip
+import hashlib
+import io
+import lzma
+import zipfile
+from fnmatch import fnmatch
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Union
+
+NESSUS_SUFFIX = '.nessus'
+
+# 單檔壓縮格式與其對應的串流解壓函式
+COMPRESSED_OPENERS: Dict[str, Callable[..., IO[bytes]]] = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+ZIP_SUFFIX = '.zip'
+# 計算內容雜湊時每次讀取的位元組數
+FINGERPRINT_BLOCK_BYTES = 1024 * 1024
+
+class _CountingReader(io.RawIOBase):
+    """
+    私有輔助類別：包裝一個已開啟的二進位檔案，每次讀取後以讀取的位元組數呼叫 `on_read`。
+    它位於解壓之前，因此累計的位元組數與 `NessusSource.size` 使用相同的單位。
+    """
+
+    def __init__(self, raw: IO[bytes], on_read: Callable[[int], None]):
+        super().__init__()
+        self._raw = raw
+        self._on_read = on_read
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return self._raw.seekable()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._raw.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._raw.tell()
+
+    def readinto(self, buffer) -> int:
+        count = self._raw.readinto(buffer)
+        if count:
+            self._on_read(count)
+        return count
+
+    def close(self) -> None:
+        self._raw.close()
+        super().close()
+
+@dataclass(frozen=True)
+class NessusSource:
+    """
+    代表一份可被解析的 .nessus 資料來源。
+    它可以是一般的 `.nessus` 檔案、單檔壓縮的 `.nessus.gz/.bz2/.xz`，
+    或是 zip 壓縮檔中的某個 `.nessus` 成員 (`member`)。
+    """
+    path: Path
+    member: Optional[str] = None
+
+    @classmethod
+    def coerce(cls, source: Union[Path, 'NessusSource']) -> 'NessusSource':
+        """將 Path 或 NessusSource 統一轉換為 NessusSource。"""
+        return source if isinstance(source, NessusSource) else cls(Path(source))
+
+    @property
+    def name(self) -> str:
+        """用於顯示的名稱（zip 成員只顯示成員檔名）。"""
+        return Path(self.member).name if self.member else self.path.name
+
+    @property
+    def size(self) -> int:
+        """來源在磁碟上佔用的位元組數（zip 成員為其壓縮後大小）。"""
+        if self.member:
+            with zipfile.ZipFile(self.path) as archive:
+                return archive.getinfo(self.member).compress_size
+        return self.path.stat().st_size
+
+    def exists(self) -> bool:
+        return self.path.is_file()
+
+    def fingerprint(self) -> str:
+        """
+        代表來源內容的識別字串，與檔案的路徑及修改時間無關。
+        zip 成員使用其 CRC、解壓後大小與成員時間，不必讀取內容，也不受同一壓縮檔中其他成員增減的影響；
+        其他來源則為檔案內容的 SHA-256。
+
+        Raises:
+            OSError, zipfile.BadZipFile, KeyError: 如果來源無法讀取或成員已不存在。
+        """
+        if self.member:
+            with zipfile.ZipFile(self.path) as archive:
+                info = archive.getinfo(self.member)
+            return f"zip:{info.CRC:08x}:{info.file_size}:{'-'.join(map(str, info.date_time))}"
+
+        digest = hashlib.sha256()
+        with open(self.path, 'rb') as f:
+            for block in iter(lambda: f.read(FINGERPRINT_BLOCK_BYTES), b''):
+                digest.update(block)
+        return f"sha256:{digest.hexdigest()}"
+
+    @contextmanager
+    def open(self, on_read: Optional[Callable[[int], None]] = None) -> Iterator[IO[bytes]]:
+        """
+        以二進位串流開啟來源，壓縮內容會在讀取時即時解壓，不產生任何暫存檔。
+
+        若提供 `on_read`，每次從磁碟讀取原始（壓縮前）資料後，會以讀取的位元組數呼叫它，
+        供呼叫端在解析單一大型檔案的過程中回報進度。
+        """
+        raw: IO[bytes] = open(self.path, 'rb')
+        if on_read is not None:
+            raw = _CountingReader(raw, on_read)
+
+        with raw:
+            if self.member:
+                with zipfile.ZipFile(raw) as archive:
+                    with archive.open(self.member) as stream:
+                        yield stream
+                return
+
+            opener = COMPRESSED_OPENERS.get(self.path.suffix.lower())
+            if opener is None:
+                yield raw
+                return
+            with opener(raw, 'rb') as stream:
+                yield stream
+
+    def __str__(self) -> str:
+        return f"{self.path}!{self.member}" if self.member else str(self.path)
+
+def is_nessus_file(path: Path) -> bool:
+    """判斷一個檔名是否為（可能經過單檔壓縮的）.nessus 檔案。"""
+    suffixes = [s.lower() for s in path.suffixes]
+    if suffixes[-1:] == [NESSUS_SUFFIX]:
+        return True
+    return len(suffixes) >= 2 and suffixes[-2] == NESSUS_SUFFIX and suffixes[-1] in COMPRESSED_OPENERS
+
+# 無法讀取的壓縮檔的回呼：(壓縮檔路徑, 例外)
+ArchiveErrorCallback = Callable[[Path, Exception], None]
+
+def sources_from_path(path: Path, on_error: Optional[ArchiveErrorCallback] = None) -> List[NessusSource]:
+    """
+    將單一檔案展開為其包含的資料來源。
+    zip 壓縮檔會展開為其中所有的 .nessus 成員；不支援的檔案回傳空列表。
+    無法讀取的 zip 壓縮檔（損毀或仍在寫入中）同樣回傳空列表，並在提供 `on_error` 時通知呼叫端。
+    """
+    if path.suffix.lower() == ZIP_SUFFIX:
+        try:
+            with zipfile.ZipFile(path) as archive:
+                return [
+                    NessusSource(path, info.filename)
+                    for info in archive.infolist()
+                    if not info.is_dir() and info.filename.lower().endswith(NESSUS_SUFFIX)
+                ]
+        except (zipfile.BadZipFile, OSError) as e:
+            if on_error:
+                on_error(path, e)
+            return []
+    if is_nessus_file(path):
+        return [NessusSource(path)]
+    return []
+
+@dataclass
+class DiscoveryOptions:
+    """
+    控制資料來源搜尋方式的選項。
+    `include` / `exclude` 為萬用字元樣式（例如 `*.nessus.gz`、`archive/*`），
+    會同時比對檔名與相對於搜尋資料夾的路徑（以 `/` 分隔）。
+    zip 壓縮檔中的成員另外比對成員路徑、成員檔名，以及「壓縮檔路徑/成員路徑」，
+    因此 `*.nessus` 也會包含壓縮檔中的 .nessus 成員。
+    """
+    recursive: bool = False
+    include: List[str] = field(default_factory=list)
+    exclude: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_settings(cls, get_setting: Callable[[str, Any], Any]) -> 'DiscoveryOptions':
+        """由 `ConfigurationManager.get_setting` 讀取 recursive、include_patterns、exclude_patterns 設定。"""
+        return cls(
+            recursive=bool(get_setting('recursive', False)),
+            include=list(get_setting('include_patterns', None) or []),
+            exclude=list(get_setting('exclude_patterns', None) or []),
+        )
+
+    @staticmethod
+    def _names(relative_path: str, member: Optional[str]) -> List[str]:
+        """私有輔助方法：一個檔案（或壓縮檔成員）用來比對樣式的所有名稱。"""
+        names = [relative_path, relative_path.rsplit('/', 1)[-1]]
+        if member:
+            names += [member, member.rsplit('/', 1)[-1], f"{relative_path}/{member}"]
+        return names
+
+    @staticmethod
+    def _matches_any(names: List[str], patterns: List[str]) -> bool:
+        return any(fnmatch(name, pattern) for name in names for pattern in patterns)
+
+    def excludes(self, relative_path: str, member: Optional[str] = None) -> bool:
+        """判斷一個相對路徑（或壓縮檔成員）是否符合任一 exclude 樣式。"""
+        return self._matches_any(self._names(relative_path, member), self.exclude)
+
+    def accepts(self, relative_path: str, member: Optional[str] = None) -> bool:
+        """判斷一個相對路徑（或 zip 壓縮檔中的成員）是否符合 include / exclude 樣式。"""
+        names = self._names(relative_path, member)
+        if self.include and not self._matches_any(names, self.include):
+            return False
+        return not self._matches_any(names, self.exclude)
+
+def discover_sources(
+    folder_path: Path,
+    options: Optional[DiscoveryOptions] = None,
+    on_error: Optional[ArchiveErrorCallback] = None
+) -> List[NessusSource]:
+    """
+    找出資料夾中所有的 .nessus 資料來源，
+    包含 `.nessus.gz`、`.nessus.bz2`、`.nessus.xz` 以及 zip 壓縮檔中的成員。
+    預設只搜尋資料夾本身；`options.recursive` 為 True 時會包含所有子資料夾。
+    無法讀取的 zip 壓縮檔會被略過，並以 `on_error` 通知呼叫端（詳見 `sources_from_path`）。
+    """
+    options = options or DiscoveryOptions()
+    candidates = folder_path.rglob('*') if options.recursive else folder_path.iterdir()
+
+    sources: List[NessusSource] = []
+    for path in sorted(candidates):
+        if not path.is_file():
+            continue
+        relative_path = path.relative_to(folder_path).as_posix()
+        if path.suffix.lower() == ZIP_SUFFIX:
+            # 壓縮檔本身被排除時不必開啟；否則逐一以成員路徑比對樣式
+            if not options.excludes(relative_path):
+                sources.extend(
+                    source for source in sources_from_path(path, on_error)
+                    if options.accepts(relative_path, source.member)
+                )
+        elif options.accepts(relative_path):
+            sources.extend(sources_from_path(path, on_error))
+    return sources
@@ -0,0 +1,246 @@
+# src/nessus_reporter/core/store.py
+
+import sqlite3
+import logging
+import zipfile
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence, Union, Iterator
+
+from .config_manager import FieldConfig
+from .sources import NessusSource
+from .parser import SCAN_TIME_COLUMN
+
+class StoreError(Exception):
+    """當弱點資料庫操作發生錯誤時引發的基礎類別。"""
+    pass
+
+class FindingsStore:
+    """
+    一個本地的 SQLite 弱點資料庫。
+    它把 `BatchProcessor` 解析出的資料逐檔增量寫入，讓跨掃描的查詢
+    （例如「今年哪些主機出現過某個 pluginID」）不必重新解析原始 XML。
+
+    欄位名稱使用設定檔中的 field `id`，查詢結果則會轉回 `displayName`，
+    因此可以直接交給 `ExcelReportGenerator` 生成報告。
+    """
+    # 這些欄位（若存在於設定檔中）會建立索引，以加速最常見的查詢
+    INDEXED_FIELD_IDS = ('host_ip', 'plugin_id', 'severity')
+    SOURCE_FILE_COLUMN = 'source_file'
+    SCAN_TIME_COLUMN = 'scan_time'
+
+    def __init__(self, db_path: Path, fields_config: List[FieldConfig]):
+        """
+        開啟（或建立）資料庫，並確保資料表結構與目前的設定檔一致。
+
+        Args:
+            db_path (Path): SQLite 資料庫檔案路徑。
+            fields_config (List[FieldConfig]): 從 ConfigurationManager 獲取的欄位設定。
+
+        Raises:
+            StoreError: 如果資料庫無法開啟或初始化。
+        """
+        self.db_path = Path(db_path)
+        self._fields = fields_config
+        self._id_by_display_name: Dict[str, str] = {f['displayName']: f['id'] for f in fields_config}
+
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path))
+            self._ensure_schema()
+        except sqlite3.Error as e:
+            raise StoreError(f"無法開啟弱點資料庫 {self.db_path}: {e}") from e
+
+    def __enter__(self) -> 'FindingsStore':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        """私有輔助方法：安全地為 SQL 識別字加上引號。"""
+        return '"' + identifier.replace('"', '""') + '"'
+
+    def _ensure_schema(self) -> None:
+        """私有方法：建立資料表與索引；設定檔新增欄位時，以 ALTER TABLE 補上。"""
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS scans (
+                    id INTEGER PRIMARY KEY,
+                    source_file TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL UNIQUE,
+                    scan_time TEXT NOT NULL,
+                    ingested_at TEXT NOT NULL
+                )
+                """
+            )
+
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS findings (
+                    id INTEGER PRIMARY KEY,
+                    scan_id INTEGER NOT NULL REFERENCES scans(id),
+                    row_ordinal INTEGER NOT NULL,
+                    source_file TEXT NOT NULL,
+                    scan_time TEXT NOT NULL,
+                    UNIQUE (scan_id, row_ordinal)
+                )
+                """
+            )
+
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(findings)")}
+            for field in self._fields:
+                if field['id'] not in existing:
+                    self._conn.execute(f"ALTER TABLE findings ADD COLUMN {self._quote(field['id'])} TEXT")
+
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_findings_source_file ON findings (source_file)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_findings_scan_time ON findings (scan_time)")
+            for field_id in self.INDEXED_FIELD_IDS:
+                if field_id in self._id_by_display_name.values():
+                    self._conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {self._quote('idx_findings_' + field_id)} "
+                        f"ON findings ({self._quote(field_id)})"
+                    )
+
+    @staticmethod
+    def _to_db_value(value: Any) -> Optional[str]:
+        """私有輔助方法：將 DataFrame 中的值轉為 SQLite 可儲存的文字（空值轉為 NULL）。"""
+        if value is None or (isinstance(value, float) and pd.isna(value)):
+            return None
+        return str(value)
+
+    @staticmethod
+    def source_key(source_path: Union[Path, NessusSource]) -> str:
+        """
+        資料來源在資料庫中的識別字串。路徑會先轉為絕對路徑，
+        因此從不同工作目錄寫入同一份掃描時仍能被辨識為同一個來源。
+        """
+        source = NessusSource.coerce(source_path)
+        return str(NessusSource(source.path.resolve(), source.member))
+
+    def is_ingested(self, source_path: Union[Path, NessusSource]) -> bool:
+        """
+        檢查某個來源的內容（以 `NessusSource.fingerprint` 識別）是否已經寫入過資料庫。
+        被移動、複製或只更新了修改時間的掃描仍會被辨識為已寫入。
+        """
+        return self._is_fingerprint_ingested(NessusSource.coerce(source_path).fingerprint())
+
+    def _is_fingerprint_ingested(self, fingerprint: str) -> bool:
+        row = self._conn.execute("SELECT 1 FROM scans WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        return row is not None
+
+    def ingest(self, source_path: Union[Path, NessusSource], df: pd.DataFrame) -> int:
+        """
+        將單一來源檔案解析出的 DataFrame 增量寫入資料庫。
+        去重以「掃描」為單位：內容相同的掃描（即使路徑或修改時間不同）重複寫入時會被直接略過；
+        同一路徑的新掃描則會完整寫入一次，因此持續存在的弱點在每次掃描中都有各自的紀錄。
+        同一掃描中內容相同的資料列會依其列序號分別保留。
+
+        掃描時間取自 DataFrame 中的 `SCAN_TIME_COLUMN`（各主機的 HOST_START），
+        若檔案中沒有該資訊，則退回使用來源檔案的修改時間。
+
+        Args:
+            source_path (Union[Path, NessusSource]): 產生這批資料的 .nessus 資料來源。
+            df (pd.DataFrame): `ConfigurableDataParser.parse_file` 的結果（建議以 `with_scan_time=True` 解析）。
+
+        Returns:
+            int: 實際新增的資料列數。
+
+        Raises:
+            StoreError: 如果寫入資料庫失敗，或來源檔案已無法讀取。
+        """
+        source = NessusSource.coerce(source_path)
+        try:
+            fingerprint = source.fingerprint()
+            if self._is_fingerprint_ingested(fingerprint):
+                logging.info(f"略過已寫入資料庫的掃描: {source.name}")
+                return 0
+            stat = source.path.stat()
+        except (OSError, zipfile.BadZipFile, KeyError) as e:
+            raise StoreError(f"無法讀取來源檔案 {source}: {e}") from e
+
+        source_file = self.source_key(source)
+        fallback_time = datetime.fromtimestamp(stat.st_mtime).isoformat(timespec='seconds')
+        if SCAN_TIME_COLUMN in df.columns:
+            row_times = [fallback_time if pd.isna(t) else str(t) for t in df[SCAN_TIME_COLUMN]]
+        else:
+            row_times = [fallback_time] * len(df)
+        scan_time = min(row_times, default=fallback_time)
+
+        columns = [c for c in df.columns if c in self._id_by_display_name]
+        field_ids = [self._id_by_display_name[c] for c in columns]
+
+        insert_sql = (
+            "INSERT INTO findings (scan_id, row_ordinal, source_file, scan_time, "
+            + ", ".join(self._quote(fid) for fid in field_ids)
+            + ") VALUES (?, ?, ?, ?" + ", ?" * len(field_ids) + ")"
+        )
+
+        def iter_rows(scan_id: int):
+            for ordinal, (row_time, values) in enumerate(zip(row_times, df[columns].itertuples(index=False, name=None))):
+                yield (scan_id, ordinal, source_file, row_time, *(self._to_db_value(v) for v in values))
+
+        try:
+            with self._conn:
+                cursor = self._conn.execute(
+                    "INSERT INTO scans (source_file, fingerprint, scan_time, ingested_at) VALUES (?, ?, ?, ?)",
+                    (source_file, fingerprint, scan_time, datetime.now().isoformat(timespec='seconds')),
+                )
+                before = self._conn.total_changes
+                self._conn.executemany(insert_sql, iter_rows(cursor.lastrowid))
+                return self._conn.total_changes - before
+        except sqlite3.Error as e:
+            raise StoreError(f"寫入弱點資料庫時發生錯誤 ({source.name}): {e}") from e
+
+    def _select_sql(self, where: str) -> str:
+        """私有輔助方法：組出以 `displayName` 為欄位名稱的查詢語句。"""
+        select_columns = [
+            f"{self._quote(f['id'])} AS {self._quote(f['displayName'])}" for f in self._fields
+        ] + [self.SOURCE_FILE_COLUMN, self.SCAN_TIME_COLUMN]
+        sql = f"SELECT {', '.join(select_columns)} FROM findings"
+        if where:
+            sql += f" WHERE {where}"
+        return sql + " ORDER BY id"
+
+    def query(self, where: str = "", params: Sequence[Any] = ()) -> pd.DataFrame:
+        """
+        從資料庫查詢資料，並回傳一個欄位名稱為 `displayName` 的 DataFrame，
+        可直接交給報告生成器使用。
+
+        Args:
+            where (str): 可選的 SQL WHERE 條件（使用 field `id` 作為欄位名稱），
+                例如 "plugin_id = ? AND scan_time >= ?"。
+            params (Sequence[Any]): WHERE 條件中的參數。
+
+        Returns:
+            pd.DataFrame: 查詢結果，另外附帶 source_file 與 scan_time 兩個欄位。
+        """
+        try:
+            return pd.read_sql_query(self._select_sql(where), self._conn, params=list(params))
+        except (sqlite3.Error, pd.errors.DatabaseError) as e:
+            raise StoreError(f"查詢弱點資料庫時發生錯誤: {e}") from e
+
+    def count(self, where: str = "", params: Sequence[Any] = ()) -> int:
+        """回傳符合條件的資料列數（條件格式與 `query` 相同）。"""
+        sql = "SELECT COUNT(*) FROM findings" + (f" WHERE {where}" if where else "")
+        try:
+            return self._conn.execute(sql, list(params)).fetchone()[0]
+        except sqlite3.Error as e:
+            raise StoreError(f"查詢弱點資料庫時發生錯誤: {e}") from e
+
+    def iter_query(self, where: str = "", params: Sequence[Any] = (), chunk_rows: int = 5000) -> Iterator[pd.DataFrame]:
+        """
+        [生成器] 與 `query` 相同，但以每批 `chunk_rows` 筆的方式逐批產出結果，
+        可直接交給報告生成器的 `generate_report_from_chunks` 串流寫出。
+        """
+        try:
+            yield from pd.read_sql_query(self._select_sql(where), self._conn, params=list(params), chunksize=chunk_rows)
+        except (sqlite3.Error, pd.errors.DatabaseError) as e:
+            raise StoreError(f"查詢弱點資料庫時發生錯誤: {e}") from e
+
+    def close(self) -> None:
+        """關閉資料庫連線。"""
+        self._conn.close()
@@ -96,6 +96,9 @@ class MainWindow(ctk.CTk, IView):
         self.status_label = ctk.CTkLabel(bottom_frame, text="準備就緒", anchor="w")
         self.status_label.grid(row=2, column=0, padx=10, pady=(0, 10), sticky="ew")
 
+        self.eta_label = ctk.CTkLabel(bottom_frame, text="", anchor="e")
+        self.eta_label.grid(row=2, column=1, padx=10, pady=(0, 10), sticky="e")
+
     def _populate_fields_from_config(self):
         """
         [動態生成] 根據從控制器獲取的設定檔，動態建立所有核取方塊。
@@ -150,10 +153,17 @@ class MainWindow(ctk.CTk, IView):
     def update_status(self, text: str):
         self.status_label.configure(text=text)
 
-    def update_progress(self, current: int, total: int):
-        progress_value = float(current) / float(total)
+    def update_progress(self, current: int, total: int, eta_seconds: Optional[float] = None):
+        progress_value = float(current) / float(total) if total else 1.0
         self.progress_bar.set(progress_value)
 
+        # 依處理吞吐量推算的預估剩餘時間
+        if eta_seconds is None or current >= total:
+            self.eta_label.configure(text="")
+        else:
+            minutes, seconds = divmod(int(eta_seconds), 60)
+            self.eta_label.configure(text=f"預估剩餘 {minutes}:{seconds:02d}")
+
     def set_ui_state(self, is_enabled: bool):
         state = "normal" if is_enabled else "disabled"
         self.generate_button.configure(state=state)
@@ -169,8 +179,8 @@ class MainWindow(ctk.CTk, IView):
     def ask_for_output_path(self) -> Optional[Path]:
         # 彈出「另存新檔」對話框
         file_path = filedialog.asksaveasfilename(
-            title="儲存 Excel 報告",
+            title="儲存報告",
             defaultextension=".xlsx",
-            filetypes=[("Excel 活頁簿", "*.xlsx"), ("所有檔案", "*.*")]
+            filetypes=[("Excel 活頁簿", "*.xlsx"), ("HTML 分頁報告 (大量資料)", "*.html"), ("所有檔案", "*.*")]
         )
         return Path(file_path) if file_path else None
@@ -0,0 +1,22 @@
+# tests/conftest.py
+
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / 'src'
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from nessus_reporter.core.config_manager import ConfigurationManager, FieldConfig  # noqa: E402
+
+@pytest.fixture
+def config_path() -> Path:
+    return ROOT_DIR / 'config.yaml'
+
+@pytest.fixture
+def fields_config(config_path: Path) -> List[FieldConfig]:
+    return ConfigurationManager.from_file(config_path).get_all_fields()
@@ -0,0 +1,47 @@
+# tests/samples.py
+"""測試用的 .nessus 樣本產生工具。"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+# 測試用的主機格式：(IP, ReportItem 列表, HOST_START)
+Host = Tuple[str, List[Dict[str, Any]], Optional[str]]
+
+def item(plugin_id: str = '1000', severity: str = '2', port: str = '80', cvss3: Optional[str] = None,
+         description: str = 'desc', plugin_output: str = 'output') -> Dict[str, Any]:
+    """建立一個 ReportItem 的描述。"""
+    return {
+        'plugin_id': plugin_id, 'severity': severity, 'port': port, 'cvss3': cvss3,
+        'description': description, 'plugin_output': plugin_output,
+    }
+
+def host(ip: str, items: List[Dict[str, Any]], start: Optional[str] = None) -> Host:
+    return (ip, items, start)
+
+def build_nessus_xml(hosts: Sequence[Host]) -> bytes:
+    """依主機與弱點描述組出一份最小的 .nessus XML。"""
+    parts = ['<?xml version="1.0" ?>\n<NessusClientData_v2><Report name="test">']
+    for ip, items, start in hosts:
+        parts.append(f'<ReportHost name={quoteattr(ip)}><HostProperties>')
+        parts.append('<tag name="operating-system">Linux</tag>')
+        if start:
+            parts.append(f'<tag name="HOST_START">{escape(start)}</tag>')
+        parts.append('</HostProperties>')
+        for entry in items:
+            parts.append(
+                f'<ReportItem port={quoteattr(entry["port"])} protocol="tcp" severity={quoteattr(entry["severity"])} '
+                f'pluginID={quoteattr(entry["plugin_id"])} pluginName={quoteattr("P" + entry["plugin_id"])} pluginFamily="F">'
+                f'<description>{escape(entry["description"])}</description><solution>fix</solution>'
+            )
+            if entry['cvss3'] is not None:
+                parts.append(f'<cvss3_base_score>{escape(entry["cvss3"])}</cvss3_base_score>')
+            parts.append(f'<plugin_output>{escape(entry["plugin_output"])}</plugin_output></ReportItem>')
+        parts.append('</ReportHost>')
+    parts.append('</Report></NessusClientData_v2>\n')
+    return ''.join(parts).encode('utf-8')
+
+def write_nessus(path: Path, hosts: Sequence[Host]) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(build_nessus_xml(hosts))
+    return path
@@ -0,0 +1,134 @@
+# tests/test_html_generator.py
+
+import json
+import shutil
+import subprocess
+
+import pandas as pd
+import pytest
+
+from nessus_reporter.core.html_generator import HtmlReportGenerator
+
+COLUMNS = ['IP', '風險等級', '弱點編號']
+
+# 以最小的 DOM 模擬在 Node 中執行檢視頁面，並依序輸出每個步驟後的頁面狀態
+VIEWER_HARNESS = r"""
+const fs = require('fs'), vm = require('vm'), path = require('path');
+const [htmlPath, stepsJson] = process.argv.slice(2);
+const dir = path.dirname(htmlPath);
+const inline = fs.readFileSync(htmlPath, 'utf8').split('<script>')[1].split('</script>')[0];
+const loaded = [];
+function el(tag) {
+  return { tag, children: [], style: {}, value: '', _t: '', disabled: false, parentNode: { style: {} },
+    appendChild(c) {
+      if (c.frag) { this.children.push(...c.children); } else { this.children.push(c); }
+      if (c.tag === 'script') {
+        setTimeout(() => {
+          loaded.push(path.basename(c.src));
+          vm.runInContext(fs.readFileSync(path.join(dir, decodeURIComponent(c.src)), 'utf8'), ctx);
+        }, 1);
+      }
+    },
+    remove() {},
+    get textContent() { return this._t; },
+    set textContent(v) { this._t = v; if (v === '') { this.children = []; } } };
+}
+const ids = {};
+['severity', 'host', 'prev', 'next', 'page', 'status', 'head', 'body'].forEach(i => { ids[i] = el('x'); });
+const document = { title: '', getElementById: i => ids[i], createElement: t => el(t),
+  createDocumentFragment: () => { const f = el('f'); f.frag = true; return f; }, body: el('body') };
+const ctx = vm.createContext({ document, Promise, setTimeout, String, Math });
+vm.runInContext(inline, ctx);
+vm.runInContext(fs.readFileSync(path.join(dir, path.basename(htmlPath, '.html') + '_data', 'manifest.js'), 'utf8'), ctx);
+const settle = () => new Promise(r => setTimeout(r, 50));
+(async () => {
+  const states = [];
+  for (const step of JSON.parse(stepsJson)) {
+    if (step.length) {
+      const [action, value] = step;
+      if (action === 'severity') { ids.severity.value = value; ids.severity.onchange(); }
+      if (action === 'host') { ids.host.value = value; ids.host.oninput(); }
+      if (action === 'next') { ids.next.onclick(); }
+    }
+    loaded.length = 0;
+    await settle();
+    states.push({ page: ids.page._t, nextDisabled: ids.next.disabled, loaded: loaded.slice(),
+      rows: ids.body.children.map(tr => tr.children.map(td => td._t)) });
+  }
+  console.log(JSON.stringify(states));
+})();
+"""
+
+def _frame():
+    # 主機依序排列，每 4 筆一個區塊：Critical 只在第一個區塊，10.0.2.* 只在最後一個區塊
+    rows = [('10.0.1.%d' % (i // 4), 'Critical' if i < 2 else 'Low', str(i)) for i in range(12)]
+    rows += [('10.0.2.%d' % i, 'Medium', str(100 + i)) for i in range(4)]
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+def _generate(tmp_path, monkeypatch, fields_config, chunk=4, page=3):
+    monkeypatch.setattr(HtmlReportGenerator, 'ROWS_PER_CHUNK', chunk)
+    monkeypatch.setattr(HtmlReportGenerator, 'PAGE_SIZE', page)
+    output = tmp_path / 'report.html'
+    HtmlReportGenerator.generate_report(_frame(), COLUMNS, output, fields_config)
+    return output
+
+def _load_js(path, prefix):
+    text = path.read_text(encoding='utf-8').strip()
+    assert text.startswith(prefix) and text.endswith(');')
+    return text[len(prefix):-2]
+
+def test_chunks_and_compact_manifest(tmp_path, monkeypatch, fields_config):
+    output = _generate(tmp_path, monkeypatch, fields_config)
+    data_dir = tmp_path / 'report_data'
+
+    manifest = json.loads(_load_js(data_dir / 'manifest.js', 'nessusReport.init('))
+    assert manifest['columns'] == COLUMNS
+    assert manifest['totalRows'] == 16
+    assert manifest['pageSize'] == 3
+    assert manifest['severityValues'] == ['Critical', 'Low', 'Medium']
+    assert manifest['chunks'] == [
+        {'rows': 4, 'severityCounts': {'Critical': 2, 'Low': 2}, 'hostRange': ['10.0.1.0', '10.0.1.0']},
+        {'rows': 4, 'severityCounts': {'Low': 4}, 'hostRange': ['10.0.1.1', '10.0.1.1']},
+        {'rows': 4, 'severityCounts': {'Low': 4}, 'hostRange': ['10.0.1.2', '10.0.1.2']},
+        {'rows': 4, 'severityCounts': {'Medium': 4}, 'hostRange': ['10.0.2.0', '10.0.2.3']},
+    ]
+
+    first = _load_js(data_dir / 'chunk_00000.js', 'nessusReport.addChunk(')
+    index, payload = first.split(',', 1)
+    assert index == '0'
+    assert json.loads(payload) == [['10.0.1.0', 'Critical', '0'], ['10.0.1.0', 'Critical', '1'],
+                                   ['10.0.1.0', 'Low', '2'], ['10.0.1.0', 'Low', '3']]
+    assert sorted(p.name for p in data_dir.glob('chunk_*.js')) == ['chunk_%05d.js' % i for i in range(4)]
+    assert 'report_data/manifest.js' in output.read_text(encoding='utf-8')
+
+def test_regeneration_removes_stale_chunks(tmp_path, monkeypatch, fields_config):
+    _generate(tmp_path, monkeypatch, fields_config, chunk=2)
+    _generate(tmp_path, monkeypatch, fields_config, chunk=8)
+
+    assert sorted(p.name for p in (tmp_path / 'report_data').glob('chunk_*.js')) == ['chunk_00000.js', 'chunk_00001.js']
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='需要 Node.js 執行檢視頁面')
+def test_viewer_paginates_over_matching_rows(tmp_path, monkeypatch, fields_config):
+    output = _generate(tmp_path, monkeypatch, fields_config)
+    harness = tmp_path / 'harness.js'
+    harness.write_text(VIEWER_HARNESS, encoding='utf-8')
+    steps = [[], ['next'], ['severity', 'Low'], ['next'], ['next'], ['severity', ''], ['host', '10.0.2.'], ['next']]
+    result = subprocess.run(['node', str(harness), str(output), json.dumps(steps)],
+                            capture_output=True, text=True, check=True)
+    states = json.loads(result.stdout)
+
+    def ids(state):
+        return [row[2] for row in state['rows']]
+
+    # 未篩選：由清單的筆數直接定位頁面
+    assert ids(states[0]) == ['0', '1', '2'] and states[0]['page'] == '1 / 6'
+    assert ids(states[1]) == ['3', '4', '5'] and states[1]['page'] == '2 / 6'
+    # 篩選風險等級後每頁都是完整的符合資料列，而不是原始區塊中剩下的部分
+    assert ids(states[2]) == ['2', '3', '4'] and states[2]['page'] == '1 / 4'
+    assert ids(states[3]) == ['5', '6', '7']
+    assert ids(states[4]) == ['8', '9', '10'] and states[4]['loaded'] == ['chunk_00002.js']
+    # 篩選主機時只載入主機範圍可能符合的區塊
+    assert ids(states[6]) == ['100', '101', '102']
+    assert states[6]['loaded'] == ['chunk_00003.js']
+    assert states[6]['page'] == '1 / 2' and not states[6]['nextDisabled']
+    assert ids(states[7]) == ['103'] and states[7]['nextDisabled']
@@ -0,0 +1,176 @@
+# tests/test_incremental.py
+
+import os
+import threading
+import time
+import zipfile
+
+import pandas as pd
+import pytest
+
+from nessus_reporter import cli
+from nessus_reporter.core import processor
+from nessus_reporter.core.incremental import IncrementalError, PartitionWriter, ProcessedManifest
+from nessus_reporter.core.processor import BatchProcessor
+from nessus_reporter.core.sources import NessusSource
+from samples import build_nessus_xml, host, item, write_nessus
+
+COLUMNS = ['IP', '弱點編號']
+
+def _refresh(folder, output, fields_config, output_format='csv', columns=COLUMNS, **kwargs):
+    return BatchProcessor.refresh_folder(folder, fields_config, output, output_format, columns, **kwargs)
+
+def _partitions(output):
+    return sorted(p.name.rsplit('-', 1)[0] + p.suffix for p in (output / 'partitions').iterdir())
+
+def _backdate(path, seconds=100):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+def test_add_change_and_remove(tmp_path, fields_config):
+    folder, output = tmp_path / 'in', tmp_path / 'out'
+    a = write_nessus(folder / 'a.nessus', [host('10.0.0.1', [item('1'), item('2')])])
+    b = write_nessus(folder / 'b.nessus', [host('10.0.0.2', [item('3')])])
+
+    result = _refresh(folder, output, fields_config)
+    assert sorted(result.added) == [str(a), str(b)] and result.rows_written == 3
+    assert _partitions(output) == ['a.nessus.csv', 'b.nessus.csv']
+
+    assert not _refresh(folder, output, fields_config).has_changes
+
+    write_nessus(a, [host('10.0.0.1', [item('9')])])
+    _backdate(a)
+    b.unlink()
+    result = _refresh(folder, output, fields_config)
+    assert result.updated == [str(a)] and result.removed == [str(b)] and result.rows_written == 1
+    assert _partitions(output) == ['a.nessus.csv']
+    partition = next((output / 'partitions').iterdir())
+    assert pd.read_csv(partition, dtype=str)['弱點編號'].tolist() == ['9']
+
+def test_new_bundle_member_leaves_existing_members_alone(tmp_path, fields_config):
+    folder, output = tmp_path / 'in', tmp_path / 'out'
+    folder.mkdir()
+    bundle = folder / 'bundle.zip'
+    with zipfile.ZipFile(bundle, 'w') as archive:
+        archive.writestr('a.nessus', build_nessus_xml([host('10.0.0.1', [item('1')])]))
+    _backdate(bundle)
+    assert len(_refresh(folder, output, fields_config).added) == 1
+
+    with zipfile.ZipFile(bundle, 'a') as archive:
+        archive.writestr('b.nessus', build_nessus_xml([host('10.0.0.2', [item('2')])]))
+    _backdate(bundle, 50)
+    result = _refresh(folder, output, fields_config)
+    assert result.added == [f"{bundle}!b.nessus"] and result.updated == [] and result.rows_written == 1
+
+def test_unreadable_bundle_is_retried_instead_of_removed(tmp_path, fields_config):
+    folder, output = tmp_path / 'in', tmp_path / 'out'
+    folder.mkdir()
+    bundle = folder / 'bundle.zip'
+    with zipfile.ZipFile(bundle, 'w') as archive:
+        archive.writestr('a.nessus', build_nessus_xml([host('10.0.0.1', [item('1')])]))
+    _backdate(bundle)
+    _refresh(folder, output, fields_config)
+    complete = bundle.read_bytes()
+
+    # 模擬複製到一半的壓縮檔
+    bundle.write_bytes(complete[:len(complete) // 2])
+    result = _refresh(folder, output, fields_config)
+    assert result.removed == []
+    assert [error['file'] for error in result.errors] == [str(bundle)]
+    assert _partitions(output) == ['a.nessus.csv']
+
+    bundle.write_bytes(complete)
+    _backdate(bundle)
+    assert not _refresh(folder, output, fields_config).errors
+    assert _partitions(output) == ['a.nessus.csv']
+
+def test_output_format_change_rewrites_all_partitions(tmp_path, fields_config):
+    folder, output = tmp_path / 'in', tmp_path / 'out'
+    write_nessus(folder / 'a.nessus', [host('10.0.0.1', [item('1')])])
+    write_nessus(folder / 'b.nessus', [host('10.0.0.2', [item('2')])])
+    _refresh(folder, output, fields_config)
+
+    result = _refresh(folder, output, fields_config, output_format='xlsx')
+    assert len(result.updated) == 2
+    assert _partitions(output) == ['a.nessus.xlsx', 'b.nessus.xlsx']
+    assert ProcessedManifest.load(output).matches_output('xlsx', COLUMNS)
+
+    result = _refresh(folder, output, fields_config, output_format='xlsx', columns=['IP'])
+    assert len(result.updated) == 2
+    assert not _refresh(folder, output, fields_config, output_format='xlsx', columns=['IP']).has_changes
+
+def test_failed_partition_write_is_retried(tmp_path, fields_config, monkeypatch):
+    folder, output = tmp_path / 'in', tmp_path / 'out'
+    a = write_nessus(folder / 'a.nessus', [host('10.0.0.1', [item('1')])])
+    _refresh(folder, output, fields_config)
+
+    original = processor.PartitionWriter.write
+    def locked(self, source, df):
+        raise PermissionError("file is locked")
+    monkeypatch.setattr(processor.PartitionWriter, 'write', locked)
+    result = _refresh(folder, output, fields_config, output_format='xlsx')
+    assert [error['file'] for error in result.errors] == [str(a)]
+
+    monkeypatch.setattr(processor.PartitionWriter, 'write', original)
+    result = _refresh(folder, output, fields_config, output_format='xlsx')
+    assert result.updated == [str(a)]
+    assert _partitions(output) == ['a.nessus.xlsx']
+
+def test_file_removed_after_discovery_is_reported(tmp_path, fields_config, monkeypatch):
+    folder, output = tmp_path / 'in', tmp_path / 'out'
+    write_nessus(folder / 'a.nessus', [host('10.0.0.1', [item('1')])])
+    ghost = NessusSource(folder / 'ghost.nessus')
+    discovered = processor.discover_sources
+    monkeypatch.setattr(processor, 'discover_sources', lambda *args, **kwargs: discovered(*args, **kwargs) + [ghost])
+
+    result = _refresh(folder, output, fields_config)
+    assert len(result.added) == 1
+    assert [error['file'] for error in result.errors] == [str(ghost)]
+
+def test_missing_zip_member_is_reported(tmp_path, fields_config, monkeypatch):
+    folder, output = tmp_path / 'in', tmp_path / 'out'
+    write_nessus(folder / 'a.nessus', [host('10.0.0.1', [item('1')])])
+    with zipfile.ZipFile(folder / 'bundle.zip', 'w') as archive:
+        archive.writestr('b.nessus', build_nessus_xml([host('10.0.0.2', [item('2')])]))
+    _backdate(folder / 'bundle.zip')
+    # 壓縮檔仍存在，但成員在搜尋後被移除：直到讀取大小時才會失敗
+    ghost = NessusSource(folder / 'bundle.zip', 'gone.nessus')
+    discovered = processor.discover_sources
+    monkeypatch.setattr(processor, 'discover_sources', lambda *args, **kwargs: discovered(*args, **kwargs) + [ghost])
+
+    result = _refresh(folder, output, fields_config)
+    assert len(result.added) == 2
+    assert [error['file'] for error in result.errors] == [str(ghost)]
+    assert str(ghost) not in ProcessedManifest.load(output).entries
+
+def test_only_formats_without_extra_dependencies_are_offered(tmp_path, config_path):
+    assert PartitionWriter.SUPPORTED_FORMATS == ('csv', 'xlsx')
+    with pytest.raises(IncrementalError, match='不支援的輸出格式'):
+        PartitionWriter(tmp_path, 'parquet', COLUMNS)
+    with pytest.raises(SystemExit):
+        cli.main(['--config', str(config_path), 'watch', str(tmp_path), '--output', str(tmp_path / 'out'), '--format', 'parquet', '--once'])
+
+def test_once_respects_settle_time(tmp_path, config_path):
+    folder, output = tmp_path / 'in', tmp_path / 'out'
+    write_nessus(folder / 'a.nessus', [host('10.0.0.1', [item('1')])])
+    args = ['--config', str(config_path), 'watch', str(folder), '--output', str(output), '--once']
+
+    assert cli.main(args + ['--settle', '3600']) == 0
+    assert not (output / 'partitions').exists()
+    assert cli.main(args + ['--settle', '0']) == 0
+    assert _partitions(output) == ['a.nessus.csv']
+
+def test_watch_survives_failed_pass(tmp_path, fields_config, monkeypatch):
+    calls = []
+    stop_event = threading.Event()
+
+    def flaky_refresh(*args, **kwargs):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise OSError("share temporarily unavailable")
+        stop_event.set()
+        return processor.IncrementalUpdateResult()
+
+    monkeypatch.setattr(BatchProcessor, 'refresh_folder', staticmethod(flaky_refresh))
+    BatchProcessor.watch_folder(tmp_path, fields_config, tmp_path / 'out', interval=0.01, stop_event=stop_event)
+    assert len(calls) == 2
@@ -0,0 +1,69 @@
+# tests/test_lazy.py
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from nessus_reporter.core.generator import ExcelReportGenerator
+from nessus_reporter.core.parser import ConfigurableDataParser, LazyTextResolver, LAZY_REF_COLUMNS
+from samples import host, item, write_nessus
+
+def _scan(tmp_path, description='desc'):
+    return write_nessus(tmp_path / 'a.nessus', [
+        host('10.0.0.1', [item('1', description=description, plugin_output='out 1'), item('2', plugin_output='out 2')]),
+        host('10.0.0.2', [item('3', plugin_output='out 3')]),
+    ])
+
+def test_lazy_frame_holds_references_instead_of_text(tmp_path, fields_config):
+    lazy_df = ConfigurableDataParser.parse_file(_scan(tmp_path), fields_config, lazy=True)
+
+    assert '弱點描述(英文)' not in lazy_df.columns
+    assert '佐證資訊' not in lazy_df.columns
+    assert all(col in lazy_df.columns for col in LAZY_REF_COLUMNS)
+    assert lazy_df['__item_index__'].tolist() == [0, 1, 2]
+
+def test_resolver_restores_eager_frame(tmp_path, fields_config):
+    scan = _scan(tmp_path)
+    eager_df = ConfigurableDataParser.parse_file(scan, fields_config)
+    lazy_df = ConfigurableDataParser.parse_file(scan, fields_config, lazy=True)
+
+    with LazyTextResolver(fields_config) as resolver:
+        # 順序被打亂時仍能依參照取回正確的文字
+        restored = resolver.materialize(lazy_df.iloc[::-1])
+    pd.testing.assert_frame_equal(restored.iloc[::-1].reset_index(drop=True), eager_df)
+
+def test_lazy_and_eager_reports_are_identical(tmp_path, fields_config):
+    scan = _scan(tmp_path)
+    columns = [f['displayName'] for f in fields_config if f.get('default')]
+    eager_path, lazy_path = tmp_path / 'eager.xlsx', tmp_path / 'lazy.xlsx'
+
+    ExcelReportGenerator.generate_report(ConfigurableDataParser.parse_file(scan, fields_config), columns, eager_path, fields_config)
+    ExcelReportGenerator.generate_report(ConfigurableDataParser.parse_file(scan, fields_config, lazy=True), columns, lazy_path, fields_config)
+
+    eager, lazy = pd.read_excel(eager_path, dtype=str), pd.read_excel(lazy_path, dtype=str)
+    pd.testing.assert_frame_equal(eager, lazy)
+    assert lazy['佐證資訊'].tolist() == ['out 1', 'out 2', 'out 3']
+
+def test_long_text_is_truncated_to_excel_limit(tmp_path, fields_config):
+    scan = _scan(tmp_path, description='x' * 40000)
+    output = tmp_path / 'report.xlsx'
+    ExcelReportGenerator.generate_report(
+        ConfigurableDataParser.parse_file(scan, fields_config, lazy=True), ['IP', '弱點描述(英文)'], output, fields_config
+    )
+
+    worksheet = load_workbook(output)[ExcelReportGenerator.SHEET_NAME]
+    assert len(worksheet['B2'].value) == ExcelReportGenerator.CELL_CHAR_LIMIT
+    assert worksheet.column_dimensions['B'].width == ExcelReportGenerator.MAX_COLUMN_WIDTH
+
+def test_streamed_report_keeps_formatting(tmp_path, fields_config):
+    df = ConfigurableDataParser.parse_file(_scan(tmp_path), fields_config)
+    chunks = [df.iloc[:1], df.iloc[1:0], df.iloc[1:]]
+    output = tmp_path / 'report.xlsx'
+    ExcelReportGenerator.generate_report_from_chunks(chunks, ['IP', '弱點編號', 'CVE ID'], output, fields_config)
+
+    worksheet = load_workbook(output)[ExcelReportGenerator.SHEET_NAME]
+    assert [cell.value for cell in worksheet[1]] == ['IP', '弱點編號', 'CVE ID']
+    assert worksheet['A1'].font.b
+    assert worksheet.freeze_panes == 'A2'
+    assert worksheet.auto_filter.ref == 'A1:C4'
+    assert [row[1] for row in worksheet.iter_rows(min_row=2, values_only=True)] == ['1', '2', '3']
+    assert worksheet['C2'].value is None
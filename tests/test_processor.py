@@ -0,0 +1,151 @@
+# tests/test_processor.py
+
+import dataclasses
+import os
+from concurrent.futures import Future
+from pathlib import Path
+
+import pandas as pd
+
+from nessus_reporter.core import processor
+from nessus_reporter.core.processor import BatchProcessor, _ProgressTracker
+from nessus_reporter.core.sharding import ShardPlanner
+from nessus_reporter.core.sources import NessusSource, discover_sources
+from samples import host, item, write_nessus
+
+COLUMNS = ['IP', '弱點編號']
+
+def _scan_folder(folder, item_counts):
+    for n, count in enumerate(item_counts):
+        write_nessus(folder / f'scan{n}.nessus', [host(f'10.0.{n}.1', [item(str(n * 1000 + i)) for i in range(count)])])
+    return folder
+
+class _InlineExecutor:
+    """依提交順序同步執行工作的替身，用來觀察排程順序。"""
+    submitted = []
+
+    def __init__(self, max_workers):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, source, *args):
+        _InlineExecutor.submitted.append(source.name)
+        future = Future()
+        future.set_result(fn(source, *args))
+        return future
+
+def _inline_pool(monkeypatch):
+    _InlineExecutor.submitted = []
+    monkeypatch.setattr(processor, 'ProcessPoolExecutor', _InlineExecutor)
+    # 一次只交出最早提交的工作，使完成順序等於提交順序
+    monkeypatch.setattr(processor, 'wait', lambda futures, return_when: ({next(iter(futures))}, set()))
+
+def test_parallel_submits_largest_first_but_keeps_discovery_order(tmp_path, fields_config, monkeypatch):
+    folder = _scan_folder(tmp_path / 'scans', [3, 20, 1, 8, 12])
+    _inline_pool(monkeypatch)
+
+    result = BatchProcessor.process_folder(folder, fields_config, max_workers=2)
+
+    assert _InlineExecutor.submitted == ['scan1.nessus', 'scan4.nessus', 'scan3.nessus', 'scan0.nessus', 'scan2.nessus']
+    serial = BatchProcessor.process_folder(folder, fields_config)
+    pd.testing.assert_frame_equal(result.dataframe, serial.dataframe)
+
+def test_streaming_parallel_results_follow_completion_order(tmp_path, fields_config, monkeypatch):
+    folder = _scan_folder(tmp_path / 'scans', [1, 5, 3])
+    _inline_pool(monkeypatch)
+
+    frames = list(BatchProcessor.iter_folder(folder, fields_config, [], max_workers=2))
+
+    assert [df['IP'].iloc[0] for df in frames] == ['10.0.1.1', '10.0.2.1', '10.0.0.1']
+
+def test_process_pool_matches_serial_order(tmp_path, fields_config):
+    folder = _scan_folder(tmp_path / 'scans', [2, 30, 1, 15])
+
+    parallel = BatchProcessor.process_folder(folder, fields_config, max_workers=2)
+    serial = BatchProcessor.process_folder(folder, fields_config)
+
+    assert parallel.errors == []
+    pd.testing.assert_frame_equal(parallel.dataframe, serial.dataframe)
+
+def _parse_or_crash(source, *args):
+    if source.name == 'boom.nessus':
+        # 模擬工作行程因記憶體不足被系統終止
+        os._exit(1)
+    return _real_parse_source(source, *args)
+
+_real_parse_source = processor._parse_source
+
+def test_crashed_worker_becomes_error_and_rest_is_parsed(tmp_path, fields_config, monkeypatch):
+    folder = _scan_folder(tmp_path / 'scans', [6, 5, 4, 3, 2, 1])
+    write_nessus(folder / 'boom.nessus', [host('10.9.9.9', [item(str(i)) for i in range(50)])])
+    monkeypatch.setattr(processor, '_parse_source', _parse_or_crash)
+
+    result = BatchProcessor.process_folder(folder, fields_config, max_workers=2)
+
+    failed = {Path(error['file']).name for error in result.errors}
+    assert 'boom.nessus' in failed
+    assert len(failed) <= 4
+    parsed = set(result.dataframe['IP'])
+    assert {'10.0.4.1', '10.0.5.1'} <= parsed
+    assert len(parsed) + len(failed) == 7
+
+def test_progress_totals(tmp_path, fields_config):
+    folder = _scan_folder(tmp_path / 'scans', [4, 2, 6])
+    (folder / 'bad.nessus').write_bytes(b'<not xml')
+    total_bytes = sum(p.stat().st_size for p in folder.iterdir())
+    reports = []
+
+    result = BatchProcessor.process_folder(folder, fields_config, progress_callback=lambda info: reports.append(dataclasses.replace(info)))
+
+    assert len(result.errors) == 1
+    first, last = reports[0], reports[-1]
+    assert (first.files_done, first.bytes_done, first.rows_done) == (0, 0, 0)
+    assert (first.files_total, first.bytes_total) == (4, total_bytes)
+    assert (last.files_done, last.bytes_done, last.rows_done) == (4, total_bytes, 12)
+    assert [r.bytes_done for r in reports] == sorted(r.bytes_done for r in reports)
+
+def test_serial_progress_advances_within_a_file(tmp_path, fields_config, monkeypatch):
+    monkeypatch.setattr(_ProgressTracker, 'REPORT_INTERVAL', 0)
+    scan = write_nessus(tmp_path / 'big.nessus', [host('10.0.0.1', [item(str(i), plugin_output='x' * 200) for i in range(2000)])])
+    size = scan.stat().st_size
+    reports = []
+
+    list(BatchProcessor.iter_sources([NessusSource(scan)], fields_config, [], progress_callback=lambda info: reports.append(dataclasses.replace(info))))
+
+    during = [r.bytes_done for r in reports if r.files_done == 0 and r.bytes_done > 0]
+    assert len(during) > 1
+    assert max(during) <= size
+    assert reports[-1].bytes_done == size
+
+def test_source_removed_after_discovery_is_reported(tmp_path, fields_config):
+    folder = _scan_folder(tmp_path / 'scans', [2, 3, 4])
+    sources = discover_sources(folder)
+    (folder / 'scan1.nessus').unlink()
+    errors, reports = [], []
+
+    frames = list(BatchProcessor.iter_sources(sources, fields_config, errors, progress_callback=reports.append))
+
+    assert [df['IP'].iloc[0] for df in frames] == ['10.0.0.1', '10.0.2.1']
+    assert [e['file'] for e in errors] == [str(folder / 'scan1.nessus')]
+    assert reports[-1].files_done == reports[-1].files_total == 2
+
+def test_shard_with_missing_file_still_writes_partial(tmp_path, fields_config):
+    folder = _scan_folder(tmp_path / 'scans', [2, 3, 4, 5])
+    manifest_path = tmp_path / 'manifest.json'
+    partials = tmp_path / 'partials'
+    manifest = ShardPlanner.create_manifest(folder, 2, manifest_path)
+    (folder / 'scan2.nessus').unlink()
+
+    shard_errors = [ShardPlanner.run_shard(manifest_path, shard["index"], fields_config, partials) for shard in manifest["shards"]]
+    assert sorted(len(errors) for errors in shard_errors) == [0, 1]
+    assert all(ShardPlanner.partial_path(partials, shard["index"]).exists() for shard in manifest["shards"])
+
+    output = tmp_path / 'merged.xlsx'
+    errors = ShardPlanner.merge_partials(manifest_path, partials, COLUMNS, output, fields_config)
+    assert [e['file'] for e in errors] == [str(folder.resolve() / 'scan2.nessus')]
+    assert len(pd.read_excel(output, dtype=str)) == 2 + 3 + 5
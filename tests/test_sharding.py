@@ -0,0 +1,110 @@
+# tests/test_sharding.py
+
+import json
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from nessus_reporter import cli
+from nessus_reporter.core.processor import BatchProcessor
+from nessus_reporter.core import sharding
+from nessus_reporter.core.sharding import ShardPlanner, ShardError
+from nessus_reporter.core.sources import NessusSource
+from samples import host, item, write_nessus
+
+COLUMNS = ['IP', '弱點編號', '風險等級', 'CVSSv3 分數']
+
+@pytest.fixture
+def scan_folder(tmp_path):
+    folder = tmp_path / 'scans'
+    for n, item_count in enumerate([12, 3, 7, 1, 5]):
+        write_nessus(folder / f'scan{n}.nessus', [
+            host(f'10.0.{n}.1', [item(str(100 + i), severity=str(i % 5), cvss3=f'{i % 10}.5') for i in range(item_count)])
+        ])
+    return folder
+
+def _plan(tmp_path, folder, shard_count=2):
+    manifest_path = tmp_path / 'shared' / 'manifest.json'
+    return manifest_path, ShardPlanner.create_manifest(folder, shard_count, manifest_path)
+
+def test_manifest_balances_bytes_and_stores_portable_paths(tmp_path, scan_folder, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manifest_path, manifest = _plan(tmp_path, scan_folder.relative_to(tmp_path), shard_count=2)
+
+    assert manifest["folder"] == str(scan_folder.resolve())
+    entries = [entry for shard in manifest["shards"] for entry in shard["sources"]]
+    assert sorted(entry["path"] for entry in entries) == [f'scan{n}.nessus' for n in range(5)]
+    sizes = [shard["total_bytes"] for shard in manifest["shards"]]
+    assert max(sizes) - min(sizes) <= max(entry["size"] for entry in entries)
+    assert json.loads(manifest_path.read_text(encoding='utf-8'))["id"] == manifest["id"]
+
+def test_plan_skips_source_removed_after_discovery(tmp_path, scan_folder, monkeypatch):
+    ghost = NessusSource(scan_folder / 'ghost.nessus')
+    discovered = sharding.discover_sources
+    monkeypatch.setattr(sharding, 'discover_sources', lambda *args, **kwargs: discovered(*args, **kwargs) + [ghost])
+
+    _, manifest = _plan(tmp_path, scan_folder)
+
+    paths = sorted(entry["path"] for shard in manifest["shards"] for entry in shard["sources"])
+    assert paths == [f'scan{n}.nessus' for n in range(5)]
+
+def test_run_and_merge_match_single_run(tmp_path, scan_folder, fields_config, monkeypatch):
+    manifest_path, manifest = _plan(tmp_path, scan_folder)
+    partials = tmp_path / 'shared' / 'partials'
+
+    single = BatchProcessor.process_folder(scan_folder, fields_config).dataframe[COLUMNS]
+    single = single.sort_values(COLUMNS).reset_index(drop=True)
+
+    # 模擬另一個節點：在不同的工作目錄、且資料夾掛載在不同位置
+    (tmp_path / 'node2').mkdir()
+    mounted = shutil.move(str(scan_folder), str(tmp_path / 'node2' / 'mnt'))
+    monkeypatch.chdir(tmp_path / 'node2')
+    for shard in manifest["shards"]:
+        assert ShardPlanner.run_shard(manifest_path, shard["index"], fields_config, partials, folder=Path(mounted)) == []
+
+    with sqlite3.connect(ShardPlanner.partial_path(partials, 0)) as conn:
+        meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+    assert meta["manifest_id"] == manifest["id"]
+
+    output = tmp_path / 'merged.xlsx'
+    assert ShardPlanner.merge_partials(manifest_path, partials, COLUMNS, output, fields_config) == []
+
+    merged = pd.read_excel(output, dtype=str).sort_values(COLUMNS).reset_index(drop=True)
+    pd.testing.assert_frame_equal(merged, single.astype(str))
+
+def test_merge_requires_every_partial(tmp_path, scan_folder, fields_config):
+    manifest_path, _ = _plan(tmp_path, scan_folder)
+    partials = tmp_path / 'shared' / 'partials'
+    ShardPlanner.run_shard(manifest_path, 0, fields_config, partials)
+
+    with pytest.raises(ShardError, match='尚未完成'):
+        ShardPlanner.merge_partials(manifest_path, partials, COLUMNS, tmp_path / 'out.xlsx', fields_config)
+
+def test_merge_rejects_partials_from_previous_manifest(tmp_path, scan_folder, fields_config):
+    manifest_path, old_manifest = _plan(tmp_path, scan_folder)
+    partials = tmp_path / 'shared' / 'partials'
+    for shard in old_manifest["shards"]:
+        ShardPlanner.run_shard(manifest_path, shard["index"], fields_config, partials)
+
+    write_nessus(scan_folder / 'scan9.nessus', [host('10.0.9.1', [item('900')])])
+    _plan(tmp_path, scan_folder)
+
+    with pytest.raises(ShardError, match='其他分片清單'):
+        ShardPlanner.merge_partials(manifest_path, partials, COLUMNS, tmp_path / 'out.xlsx', fields_config)
+
+def test_cli_runs_all_shards_in_local_processes(tmp_path, scan_folder, config_path):
+    manifest_path = tmp_path / 'manifest.json'
+    partials = tmp_path / 'partials'
+    output = tmp_path / 'report.xlsx'
+    base = ['--config', str(config_path)]
+
+    assert cli.main(base + ['shard-plan', str(scan_folder), '--shards', '3', '--manifest', str(manifest_path)]) == 0
+    assert cli.main(base + ['shard-run', str(manifest_path), '--partials', str(partials), '--workers', '2']) == 0
+    assert cli.main(base + ['shard-merge', str(manifest_path), '--partials', str(partials), '--output', str(output)]) == 0
+
+    report = pd.read_excel(output, dtype=str)
+    assert len(report) == 28
+    assert report['風險等級'].iloc[0] == 'Critical'
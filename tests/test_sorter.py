@@ -0,0 +1,132 @@
+# tests/test_sorter.py
+
+import pickle
+
+import pandas as pd
+import pytest
+
+from nessus_reporter.app_controller import AppController, MockMainWindow
+from nessus_reporter.core.config_manager import InvalidConfigError
+from nessus_reporter.core.generator import ExcelReportGenerator
+from nessus_reporter.core.parser import ConfigurableDataParser
+from nessus_reporter.core import sorter as sorter_module
+from nessus_reporter.core.sorter import ExternalSorter, SortKey
+from samples import host, item, write_nessus
+
+SORT_BY = [{'field': 'severity', 'ascending': False}, {'field': 'cvss3_score', 'ascending': False}, 'host_ip']
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=['IP', '風險等級', 'CVSSv3 分數'])
+
+def test_sorts_mapped_numeric_and_ip_keys_across_spilled_runs(fields_config):
+    sort_keys = SortKey.from_config(SORT_BY, fields_config)
+    batches = [
+        _frame([('10.0.0.10', 'High', '7.5'), ('10.0.0.9', 'Critical', None), ('10.0.0.2', 'Info', None)]),
+        _frame([('10.0.0.9', 'High', '7.5'), ('10.0.0.1', 'High', '9.8'), ('10.0.0.3', 'Medium', '5.0')]),
+        _frame([('10.0.0.1', 'Critical', '10.0'), ('10.0.0.4', 'Low', '2.1'), ('10.0.0.5', 'High', None)]),
+    ]
+
+    with ExternalSorter(sort_keys, ['IP', '風險等級', 'CVSSv3 分數'], run_rows=2) as sorter:
+        for batch in batches:
+            sorter.add(batch)
+        # 段落依累積的列數寫出，而不是每批一個；剩下的一列在合併前寫出
+        assert len(sorter._runs) == 4
+        result = pd.concat(sorter.iter_sorted_chunks(chunk_rows=4), ignore_index=True)
+
+    assert list(result.itertuples(index=False, name=None)) == [
+        ('10.0.0.1', 'Critical', '10.0'),
+        ('10.0.0.9', 'Critical', None),
+        ('10.0.0.1', 'High', '9.8'),
+        ('10.0.0.9', 'High', '7.5'),
+        ('10.0.0.10', 'High', '7.5'),
+        ('10.0.0.5', 'High', None),
+        ('10.0.0.3', 'Medium', '5.0'),
+        ('10.0.0.4', 'Low', '2.1'),
+        ('10.0.0.2', 'Info', None),
+    ]
+
+def test_many_small_batches_merge_with_bounded_open_files(fields_config, monkeypatch):
+    sort_keys = SortKey.from_config(['host_ip'], fields_config)
+    open_files, peak = [], []
+    real_open = open
+
+    class TrackedFile:
+        def __init__(self, *args):
+            self._f = real_open(*args)
+            open_files.append(self)
+            peak.append(len(open_files))
+
+        def __getattr__(self, name):
+            return getattr(self._f, name)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.close()
+
+        def close(self):
+            if self in open_files:
+                open_files.remove(self)
+            self._f.close()
+
+    monkeypatch.setattr(sorter_module, 'open', TrackedFile, raising=False)
+    ips = [f'10.0.{n // 250}.{n % 250}' for n in range(600)]
+    with ExternalSorter(sort_keys, ['IP'], run_rows=10, merge_fan_in=4) as sorter:
+        for ip in reversed(ips):
+            sorter.add(_frame([(ip, 'Low', None)])[['IP']])
+        assert len(sorter._runs) == 60
+        result = pd.concat(sorter.iter_sorted_chunks(chunk_rows=100), ignore_index=True)
+
+    assert result['IP'].tolist() == ips
+    assert max(peak) <= 5
+    assert open_files == []
+
+def test_spilled_blocks_are_sized_by_bytes(fields_config):
+    sort_keys = SortKey.from_config(['host_ip'], fields_config)
+    rows = [(f'10.0.0.{n}', 'x' * 10000) for n in range(20)]
+    with ExternalSorter(sort_keys, ['IP', '佐證資訊'], run_rows=20, block_bytes=32 * 1024) as sorter:
+        sorter.add(pd.DataFrame(rows, columns=['IP', '佐證資訊']))
+        with open(sorter._runs[0], 'rb') as f:
+            blocks = [len(block) for block in iter(lambda: _load_or_none(f), None)]
+        result = pd.concat(sorter.iter_sorted_chunks(), ignore_index=True)
+
+    assert blocks == [4] * 5
+    assert len(result) == 20
+
+def _load_or_none(f):
+    try:
+        return pickle.load(f)
+    except EOFError:
+        return None
+
+def test_sort_by_rejects_unknown_field(fields_config):
+    with pytest.raises(InvalidConfigError):
+        SortKey.from_config(['no_such_field'], fields_config)
+
+def test_sorted_lazy_report_reads_each_source_once(tmp_path, monkeypatch):
+    folder = tmp_path / 'scans'
+    for n in range(3):
+        write_nessus(folder / f'scan{n}.nessus', [
+            host(f'10.0.{n}.{h}', [item(str(i), severity=str(i % 5), plugin_output=f'out {n}-{h}-{i}') for i in range(5)])
+            for h in range(2)
+        ])
+
+    calls = []
+    original = ConfigurableDataParser.iter_item_values
+    monkeypatch.setattr(
+        ConfigurableDataParser, 'iter_item_values',
+        staticmethod(lambda source, fields: (calls.append(source), original(source, fields))[1])
+    )
+    monkeypatch.setattr(ExcelReportGenerator, 'WRITE_BATCH_ROWS', 3)
+
+    controller = AppController(MockMainWindow)
+    output = tmp_path / 'report.xlsx'
+    assert controller._generate_sorted_report(folder, output, ['IP', '風險等級', '佐證資訊'], None, True, [])
+
+    assert len(calls) == 3
+    report = pd.read_excel(output, dtype=str)
+    assert len(report) == 30
+    assert report['風險等級'].tolist()[:6] == ['Critical'] * 6
+    assert all(out.startswith('out ') for out in report['佐證資訊'])
+    assert {tuple(out.split()[1].split('-')[2:]) for out in report.loc[report['風險等級'] == 'Critical', '佐證資訊']} == {('4',)}
@@ -0,0 +1,77 @@
+# tests/test_sources.py
+
+import bz2
+import gzip
+import lzma
+import zipfile
+
+import pandas as pd
+import pytest
+
+from nessus_reporter.core.parser import ConfigurableDataParser
+from nessus_reporter.core.sources import DiscoveryOptions, NessusSource, discover_sources
+from samples import build_nessus_xml, host, item
+
+XML = build_nessus_xml([host('10.0.0.1', [item('1'), item('2', severity='4')]), host('10.0.0.2', [item('3')])])
+
+@pytest.fixture
+def scan_folder(tmp_path):
+    (tmp_path / 'plain.nessus').write_bytes(XML)
+    (tmp_path / 'a.nessus.gz').write_bytes(gzip.compress(XML))
+    (tmp_path / 'b.nessus.bz2').write_bytes(bz2.compress(XML))
+    (tmp_path / 'c.nessus.xz').write_bytes(lzma.compress(XML))
+    with zipfile.ZipFile(tmp_path / 'bundle.zip', 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('nested/d.nessus', XML)
+        archive.writestr('readme.txt', 'not a scan')
+    (tmp_path / 'notes.txt').write_text('ignored')
+    (tmp_path / 'other.gz').write_bytes(gzip.compress(b'ignored'))
+    (tmp_path / 'broken.zip').write_bytes(b'not a zip')
+    return tmp_path
+
+def test_discovers_plain_compressed_and_zip_members(scan_folder):
+    sources = discover_sources(scan_folder)
+    assert sorted(s.name for s in sources) == [
+        'a.nessus.gz', 'b.nessus.bz2', 'c.nessus.xz', 'd.nessus', 'plain.nessus'
+    ]
+    member = next(s for s in sources if s.member)
+    assert member == NessusSource(scan_folder / 'bundle.zip', 'nested/d.nessus')
+    assert str(member) == f"{scan_folder / 'bundle.zip'}!nested/d.nessus"
+
+def test_patterns_apply_to_zip_members(scan_folder):
+    def names(**kwargs):
+        return sorted(s.name for s in discover_sources(scan_folder, DiscoveryOptions(**kwargs)))
+
+    assert names(include=['*.nessus']) == ['d.nessus', 'plain.nessus']
+    assert names(include=['nested/*']) == ['d.nessus']
+    assert names(include=['bundle.zip/nested/*']) == ['d.nessus']
+    assert names(include=['*.zip']) == ['d.nessus']
+    assert names(exclude=['*.zip', '*.gz', '*.bz2', '*.xz']) == ['plain.nessus']
+    assert names(include=['*.nessus'], exclude=['d.*']) == ['plain.nessus']
+
+def test_compressed_sources_parse_like_plain_file(scan_folder, fields_config):
+    expected = ConfigurableDataParser.parse_file(scan_folder / 'plain.nessus', fields_config)
+    assert len(expected) == 3
+
+    for source in discover_sources(scan_folder):
+        parsed = ConfigurableDataParser.parse_file(source, fields_config)
+        pd.testing.assert_frame_equal(parsed, expected)
+
+def test_zip_member_size_is_compressed_size(scan_folder):
+    member = NessusSource(scan_folder / 'bundle.zip', 'nested/d.nessus')
+    with zipfile.ZipFile(member.path) as archive:
+        assert member.size == archive.getinfo('nested/d.nessus').compress_size
+    assert member.size < len(XML)
+
+def test_read_callback_counts_bytes_before_decompression(scan_folder):
+    for name in ['plain.nessus', 'a.nessus.gz', 'c.nessus.xz']:
+        source = NessusSource(scan_folder / name)
+        counts = []
+        with source.open(counts.append) as stream:
+            assert stream.read() == XML
+        assert sum(counts) == source.size
+
+    member = NessusSource(scan_folder / 'bundle.zip', 'nested/d.nessus')
+    counts = []
+    with member.open(counts.append) as stream:
+        assert stream.read() == XML
+    assert sum(counts) >= member.size
@@ -0,0 +1,111 @@
+# tests/test_store.py
+
+import os
+import shutil
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+
+from nessus_reporter import cli
+from nessus_reporter.core.parser import ConfigurableDataParser, SCAN_TIME_COLUMN
+from nessus_reporter.core.processor import BatchProcessor
+from nessus_reporter.core.store import FindingsStore
+from samples import build_nessus_xml, host, item, write_nessus
+
+JAN = 'Mon Jan 15 10:00:00 2024'
+MAR = 'Fri Mar 15 09:30:00 2024'
+
+def _ingest(store: FindingsStore, path: Path, fields_config) -> int:
+    df = ConfigurableDataParser.parse_file(path, fields_config, with_scan_time=True)
+    return store.ingest(path, df)
+
+def test_identical_findings_in_one_scan_are_kept(tmp_path, fields_config):
+    scan = write_nessus(tmp_path / 'a.nessus', [host('10.0.0.1', [item('1'), item('1'), item('2')], JAN)])
+    with FindingsStore(tmp_path / 'store.db', fields_config) as store:
+        assert _ingest(store, scan, fields_config) == 3
+        assert len(store.query()) == 3
+
+def test_same_scan_is_ingested_once(tmp_path, fields_config):
+    scan = write_nessus(tmp_path / 'a.nessus', [host('10.0.0.1', [item('1'), item('2')], JAN)])
+    with FindingsStore(tmp_path / 'store.db', fields_config) as store:
+        assert _ingest(store, scan, fields_config) == 2
+        assert _ingest(store, scan, fields_config) == 0
+        assert len(store.query()) == 2
+
+def test_rescan_of_same_path_records_every_finding_again(tmp_path, fields_config):
+    scan = write_nessus(tmp_path / 'a.nessus', [host('10.0.0.1', [item('1'), item('2')], JAN)])
+    with FindingsStore(tmp_path / 'store.db', fields_config) as store:
+        _ingest(store, scan, fields_config)
+        write_nessus(scan, [host('10.0.0.1', [item('1')], MAR)])
+        os.utime(scan, (1_800_000_000, 1_800_000_000))
+        assert _ingest(store, scan, fields_config) == 1
+
+        history = store.query('plugin_id = ?', ['1'])
+        assert list(history['scan_time']) == ['2024-01-15T10:00:00', '2024-03-15T09:30:00']
+
+def test_adding_member_to_bundle_only_ingests_the_new_member(tmp_path, fields_config):
+    bundle = tmp_path / 'bundle.zip'
+    with zipfile.ZipFile(bundle, 'w') as archive:
+        archive.writestr('a.nessus', build_nessus_xml([host('10.0.0.1', [item('1'), item('2')], JAN)]))
+    with FindingsStore(tmp_path / 'store.db', fields_config) as store:
+        BatchProcessor.process_folder(tmp_path, fields_config, sink=store)
+        with zipfile.ZipFile(bundle, 'a') as archive:
+            archive.writestr('b.nessus', build_nessus_xml([host('10.0.0.2', [item('3')], MAR)]))
+        BatchProcessor.process_folder(tmp_path, fields_config, sink=store)
+        assert store.count() == 3
+
+def test_touched_or_copied_scan_is_not_duplicated(tmp_path, fields_config):
+    scan = write_nessus(tmp_path / 'a.nessus', [host('10.0.0.1', [item('1'), item('2')], JAN)])
+    with FindingsStore(tmp_path / 'store.db', fields_config) as store:
+        assert _ingest(store, scan, fields_config) == 2
+        os.utime(scan, (1_800_000_000, 1_800_000_000))
+        assert _ingest(store, scan, fields_config) == 0
+        copy = tmp_path / 'copy' / 'a.nessus'
+        copy.parent.mkdir()
+        shutil.copy(scan, copy)
+        assert store.is_ingested(copy)
+        assert _ingest(store, copy, fields_config) == 0
+        assert store.count() == 2
+
+def test_scan_time_falls_back_to_file_mtime(tmp_path, fields_config):
+    scan = write_nessus(tmp_path / 'a.nessus', [host('10.0.0.1', [item('1')])])
+    os.utime(scan, (1_700_000_000, 1_700_000_000))
+    with FindingsStore(tmp_path / 'store.db', fields_config) as store:
+        _ingest(store, scan, fields_config)
+        expected = pd.Timestamp.fromtimestamp(1_700_000_000).isoformat()
+        assert store.query()['scan_time'].tolist() == [expected]
+
+def test_source_path_is_resolved(tmp_path, fields_config, monkeypatch):
+    scan = write_nessus(tmp_path / 'scans' / 'a.nessus', [host('10.0.0.1', [item('1')], JAN)])
+    with FindingsStore(tmp_path / 'store.db', fields_config) as store:
+        monkeypatch.chdir(tmp_path)
+        _ingest(store, Path('scans/a.nessus'), fields_config)
+        monkeypatch.chdir(tmp_path / 'scans')
+        assert store.is_ingested(Path('a.nessus'))
+        assert store.query()['source_file'].tolist() == [str(scan.resolve())]
+
+def test_processor_sink_does_not_leak_internal_column(tmp_path, fields_config):
+    write_nessus(tmp_path / 'scans' / 'a.nessus', [host('10.0.0.1', [item('1')], JAN)])
+    with FindingsStore(tmp_path / 'store.db', fields_config) as store:
+        result = BatchProcessor.process_folder(tmp_path / 'scans', fields_config, sink=store)
+        assert SCAN_TIME_COLUMN not in result.dataframe.columns
+        assert store.query()['scan_time'].tolist() == ['2024-01-15T10:00:00']
+
+def test_query_command_builds_report_from_store(tmp_path, fields_config, config_path):
+    db_path = tmp_path / 'store.db'
+    with FindingsStore(db_path, fields_config) as store:
+        _ingest(store, write_nessus(tmp_path / 'a.nessus', [host('10.0.0.1', [item('7'), item('8')], JAN)]), fields_config)
+        _ingest(store, write_nessus(tmp_path / 'b.nessus', [host('10.0.0.2', [item('7')], MAR)]), fields_config)
+
+    output = tmp_path / 'report.xlsx'
+    exit_code = cli.main([
+        '--config', str(config_path), 'query', '--store', str(db_path),
+        '--plugin', '7', '--since', '2024-01-01', '--output', str(output),
+    ])
+
+    assert exit_code == 0
+    report = pd.read_excel(output, dtype=str)
+    assert sorted(report['IP']) == ['10.0.0.1', '10.0.0.2']
+    assert set(report['弱點編號']) == {'7'}
+    assert 'scan_time' in report.columns